@@ -0,0 +1,26 @@
+"""Create owner indexes for todos
+
+Revision ID: 4b7e2a91c3d5
+Revises: dc2f43f187ec
+Create Date: 2026-10-18 11:40:12.518204
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2a91c3d5'
+down_revision: Union[str, Sequence[str], None] = 'dc2f43f187ec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_todos_owner_id_id', 'todos', ['owner_id', 'id'])
+    op.create_index('ix_todos_owner_id_complete_priority', 'todos', ['owner_id', 'complete', 'priority'])
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_owner_id_complete_priority', table_name='todos')
+    op.drop_index('ix_todos_owner_id_id', table_name='todos')
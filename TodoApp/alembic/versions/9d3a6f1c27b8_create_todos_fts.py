@@ -0,0 +1,50 @@
+"""Create todos_fts
+
+Revision ID: 9d3a6f1c27b8
+Revises: 4b7e2a91c3d5
+Create Date: 2026-10-18 16:05:47.281930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3a6f1c27b8'
+down_revision: Union[str, Sequence[str], None] = '4b7e2a91c3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Índice full-text de conteúdo externo (lê o texto da tabela todos) e os triggers que o mantêm em dia.
+    op.execute(
+        "CREATE VIRTUAL TABLE todos_fts USING fts5("
+        "title, description, owner_id, content='todos', content_rowid='id')"
+    )
+    op.execute(
+        "CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN "
+        "INSERT INTO todos_fts(rowid, title, description, owner_id) VALUES (new.id, new.title, new.description, new.owner_id); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN "
+        "INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) "
+        "VALUES ('delete', old.id, old.title, old.description, old.owner_id); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER todos_fts_au AFTER UPDATE OF title, description, owner_id ON todos BEGIN "
+        "INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) "
+        "VALUES ('delete', old.id, old.title, old.description, old.owner_id); "
+        "INSERT INTO todos_fts(rowid, title, description, owner_id) VALUES (new.id, new.title, new.description, new.owner_id); "
+        "END"
+    )
+    # Indexa os todos que já existem.
+    op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER todos_fts_au')
+    op.execute('DROP TRIGGER todos_fts_ad')
+    op.execute('DROP TRIGGER todos_fts_ai')
+    op.execute('DROP TABLE todos_fts')
@@ -0,0 +1,54 @@
+"""Create todo_stats
+
+Revision ID: c58e2b7d4f19
+Revises: 9d3a6f1c27b8
+Create Date: 2026-10-18 17:22:09.604113
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e2b7d4f19'
+down_revision: Union[str, Sequence[str], None] = '9d3a6f1c27b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_KEY = 'coalesce(new.owner_id, 0), coalesce(new.priority, 0), coalesce(new.complete, 0)'
+OLD_KEY_MATCH = 'owner_id = coalesce(old.owner_id, 0) AND priority = coalesce(old.priority, 0) AND complete = coalesce(old.complete, 0)'
+INCREMENT_NEW = (
+    f'INSERT INTO todo_stats(owner_id, priority, complete, count) VALUES ({NEW_KEY}, 1) '
+    'ON CONFLICT(owner_id, priority, complete) DO UPDATE SET count = count + 1; '
+)
+DECREMENT_OLD = f'UPDATE todo_stats SET count = count - 1 WHERE {OLD_KEY_MATCH}; '
+
+
+def upgrade() -> None:
+    op.create_table(
+        'todo_stats',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('complete', sa.Boolean(), nullable=False),
+        sa.Column('count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('owner_id', 'priority', 'complete'),
+    )
+    op.execute(f'CREATE TRIGGER todo_stats_ai AFTER INSERT ON todos BEGIN {INCREMENT_NEW}END')
+    op.execute(f'CREATE TRIGGER todo_stats_ad AFTER DELETE ON todos BEGIN {DECREMENT_OLD}END')
+    op.execute(
+        'CREATE TRIGGER todo_stats_au AFTER UPDATE OF owner_id, priority, complete ON todos '
+        'WHEN old.owner_id IS NOT new.owner_id OR old.priority IS NOT new.priority OR old.complete IS NOT new.complete '
+        f'BEGIN {DECREMENT_OLD}{INCREMENT_NEW}END'
+    )
+    # Conta os todos que já existem.
+    op.execute(
+        'INSERT INTO todo_stats(owner_id, priority, complete, count) '
+        'SELECT coalesce(owner_id, 0), coalesce(priority, 0), coalesce(complete, 0), count(*) FROM todos GROUP BY 1, 2, 3'
+    )
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER todo_stats_au')
+    op.execute('DROP TRIGGER todo_stats_ad')
+    op.execute('DROP TRIGGER todo_stats_ai')
+    op.drop_table('todo_stats')
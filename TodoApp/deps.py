@@ -0,0 +1,68 @@
+"""
+Sessões de banco por requisição, compartilhadas entre todas as dependências da mesma requisição.
+
+Antes cada router tinha o seu próprio get_db ('async with database.AsyncSessionLocal() as db: yield db').
+Agora todos usam as dependências daqui:
+
+    - get_request_sessions → um RequestSessions por requisição (o FastAPI guarda o resultado de uma dependência e
+      entrega o mesmo objeto para todas as outras que dependem dela na mesma requisição);
+    - get_db / get_read_db → a sessão de escrita / somente leitura do banco principal, tiradas desse RequestSessions.
+
+Nada aqui abre conexão antes da hora:
+
+    - a sessão só é criada quando alguma dependência pede por ela (get_db, get_read_db ou o get_db do router de todos,
+      que escolhe o shard do usuário), e as rotas declaram o usuário antes do banco: um 401 do get_current_user
+      interrompe a requisição antes disso;
+    - uma AsyncSession só pega uma conexão do pool na primeira query, e a devolve no commit/rollback;
+    - no fim da requisição, depois que a rota retornou e o corpo da resposta foi montado, as sessões são fechadas
+      e qualquer conexão que ainda estivesse com elas volta ao pool antes do envio da resposta.
+"""
+
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from . import database
+
+
+class RequestSessions:
+    """As sessões abertas durante uma requisição, no máximo uma por fábrica de sessões (banco/shard, escrita ou leitura)."""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def get(self, session_factory: async_sessionmaker) -> AsyncSession:
+        session = self._sessions.get(session_factory)
+        if session is None:
+            session = self._sessions[session_factory] = session_factory()
+        return session
+
+    async def close(self):
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            await session.close()
+
+
+async def get_request_sessions():
+    sessions = RequestSessions()
+    try:
+        yield sessions
+    finally:
+        await sessions.close()
+
+
+request_sessions_dependency = Annotated[RequestSessions, Depends(get_request_sessions)]
+
+
+async def get_db(sessions: request_sessions_dependency) -> AsyncSession:
+    return sessions.get(database.AsyncSessionLocal)
+
+
+async def get_read_db(sessions: request_sessions_dependency) -> AsyncSession:
+    # Engine somente leitura (database.ReadSessionLocal), para as rotas GET: não disputa o pool pequeno de escrita.
+    return sessions.get(database.ReadSessionLocal)
+
+
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_db)]
@@ -0,0 +1,65 @@
+"""
+Exportação de todos os todos em NDJSON ou CSV, em streaming.
+
+Em vez de montar a lista inteira de objetos do ORM e um único documento JSON gigante, as linhas vêm do banco
+aos poucos (db.stream + yield_per: o driver busca 'EXPORT_BATCH_SIZE' linhas por vez) e cada lote vira um pedaço
+da resposta assim que chega. A memória usada fica em torno de um lote, não importa quantos todos a tabela tenha.
+
+A sessão é aberta dentro do próprio gerador: a resposta só começa a ser enviada depois que a rota retorna,
+e nesse momento a sessão do get_db (dependência com yield) já foi fechada.
+
+Com vários shards (database.SHARD_COUNT) os shards são lidos um depois do outro. Como cada shard gera ids numa faixa
+acima da do anterior, a saída continua ordenada por id.
+"""
+
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import select
+
+from .models import Todos
+
+EXPORT_BATCH_SIZE = int(os.getenv('TODOAPP_EXPORT_BATCH_SIZE', 1000))
+
+EXPORT_COLUMNS = ('id', 'title', 'description', 'priority', 'complete', 'owner_id')
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def export_statement():
+    # Colunas (e não entidades do ORM): cada linha é só uma tupla, sem identity map nem objetos por linha.
+    return (
+        select(*(getattr(Todos, name) for name in EXPORT_COLUMNS))
+        .order_by(Todos.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def ndjson_chunk(rows) -> bytes:
+    return ''.join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, separators=(',', ':')) + '\n' for row in rows
+    ).encode()
+
+
+def csv_chunk(rows, header=False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_todos(session_factories, format: str):
+    if format == 'csv':
+        yield csv_chunk((), header=True)
+    for session_factory in session_factories:
+        async with session_factory() as db:
+            result = await db.stream(export_statement())
+            async for rows in result.partitions():
+                yield csv_chunk(rows) if format == 'csv' else ndjson_chunk(rows)
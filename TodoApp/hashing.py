@@ -0,0 +1,169 @@
+"""
+Hash e verificação de senhas fora do event loop.
+
+O bcrypt é lento de propósito (algo em torno de 250 ms de CPU por chamada). Se ele roda direto dentro de um 'async def',
+o event loop fica travado durante todo esse tempo e nenhuma outra requisição do worker é atendida.
+
+Aqui as chamadas são enviadas para um pool de processos (por padrão um processo por núcleo), então vários logins
+rodam em paralelo em núcleos diferentes enquanto o event loop continua livre para as outras rotas.
+
+O custo do bcrypt (rounds: cada round a mais dobra o tempo) vem de TODOAPP_BCRYPT_ROUNDS. Para escolher o valor para a
+máquina onde o app roda, meça antes com:
+
+    python -m TodoApp.hashing calibrate --target-ms 250
+
+Hashes gravados com outro número de rounds são refeitos no próximo login bem-sucedido do usuário (authenticate_user),
+então mudar o custo não exige que ninguém troque de senha.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from starlette import status
+
+BCRYPT_ROUNDS = int(os.getenv('TODOAPP_BCRYPT_ROUNDS', 12))
+
+# Define que usaremos bcrypt para hash de senha.
+bcrypt_context = CryptContext(
+    schemes=['bcrypt'],
+    deprecated='auto',
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+"""
+    bcrypt_context.hash(...) cria um hash.
+    bcrypt_context.verify(...) compara senha crua com o hash armazenado.
+    bcrypt_context.needs_update(...) diz se o hash foi gravado com outro custo (fora de min_rounds..max_rounds)
+        e deve ser refeito. Com min = max = BCRYPT_ROUNDS os hashes convergem para o custo configurado,
+        tanto subindo quanto descendo.
+"""
+
+HASH_WORKERS = int(os.getenv('TODOAPP_HASH_WORKERS', os.cpu_count() or 1))
+
+HASH_MAX_PENDING = int(os.getenv('TODOAPP_HASH_MAX_PENDING', HASH_WORKERS * 8))
+"""
+    HASH_WORKERS → Quantos processos fazem hash ao mesmo tempo.
+
+    HASH_MAX_PENDING → Tamanho máximo da fila (em execução + esperando).
+        Quando a fila está cheia a requisição recebe 503 na hora, em vez de ficar esperando
+        atrás de uma avalanche de logins e segurando memória/conexões.
+"""
+
+_executor = None
+_pending = 0
+
+
+def get_executor():
+    # O pool só é criado no primeiro uso, assim importar o app não sobe processos.
+    global _executor
+    if _executor is None:
+        # 'forkserver' e não o 'fork' padrão do Linux: no primeiro login o processo já tem várias threads (uma por conexão do
+        # aiosqlite, o portal do anyio...), e um fork copiaria locks que outra thread está segurando, travando o filho.
+        # Os processos do pool saem de um servidor de fork que começa limpo, sem essas threads.
+        _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context('forkserver'))
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+# Funções de módulo (e não métodos) para que o ProcessPoolExecutor consiga enviá-las via pickle para os processos filhos.
+def _hash(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt_context.verify(password, hashed_password)
+
+
+async def _run(func, *args):
+    global _pending
+    if _pending >= HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Too many password operations in progress',
+            headers={'Retry-After': '1'}
+        )
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _run(_verify, password, hashed_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    # Só lê o custo gravado no próprio hash ('$2b$12$...'), não roda o bcrypt: pode ficar no event loop.
+    return bcrypt_context.needs_update(hashed_password)
+
+
+def time_hash(rounds: int, samples: int = 3) -> float:
+    """Mediana, em segundos, de 'samples' hashes com 'rounds' rounds nesta máquina."""
+    handler = bcrypt_context.handler().using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash('calibration-password')
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate_rounds(target_ms: float, samples: int = 3, min_rounds: int = 4, max_rounds: int = 20, measure=time_hash):
+    """
+    Devolve (maior número de rounds cujo hash cabe em 'target_ms', {rounds: ms medidos}).
+
+    Mede do menor custo para o maior e para no primeiro que passa do alvo (o próximo levaria o dobro).
+    Se nem 'min_rounds' cabe no alvo, devolve 'min_rounds'.
+    """
+    chosen = min_rounds
+    timings = {}
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = round(measure(rounds, samples) * 1000, 1)
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m TodoApp.hashing')
+    commands = parser.add_subparsers(dest='command', required=True)
+    calibrate = commands.add_parser('calibrate', help='mede o bcrypt nesta máquina e sugere TODOAPP_BCRYPT_ROUNDS')
+    calibrate.add_argument('--target-ms', type=float, default=250, help='tempo máximo de um hash/verify (padrão: 250 ms)')
+    calibrate.add_argument('--samples', type=int, default=3)
+    args = parser.parse_args()
+
+    time_hash(4, samples=1)  # o primeiro hash carrega o backend do bcrypt; fora da medida
+    rounds, timings = calibrate_rounds(args.target_ms, args.samples)
+    for measured_rounds, ms in timings.items():
+        print(f'rounds={measured_rounds:<3} {ms:>9.1f} ms')
+    # Cada processo do pool faz um hash/verify por vez: isso dá o teto de logins por segundo do app.
+    logins_per_sec = HASH_WORKERS * 1000 / timings[rounds]
+    print(f'Current: TODOAPP_BCRYPT_ROUNDS={BCRYPT_ROUNDS}')
+    print(f'Suggested for {args.target_ms:g} ms: TODOAPP_BCRYPT_ROUNDS={rounds} '
+          f'(~{logins_per_sec:.1f} logins/s with {HASH_WORKERS} hash workers)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Limite de tentativas de login (POST /auth/token) por username e por IP do cliente, com token buckets.
+
+Cada tentativa de login faz um bcrypt verify (centenas de milissegundos de CPU, ver hashing.py). Uma onda de
+credential stuffing ou de força bruta ocupa todos os processos de hash e deixa o resto do app sem CPU.
+Aqui cada chave ('user:<username>' e 'ip:<ip>') tem um balde com 'burst' fichas que é reabastecido a 'per_minute' fichas
+por minuto. Cada tentativa gasta uma ficha de cada balde, e a checagem roda antes do authenticate_user: com o balde
+vazio a resposta é um 429 com Retry-After, sem consulta ao banco e sem bcrypt.
+
+Os baldes ficam num backend plugável (ThrottleBackend). O padrão, InMemoryTokenBuckets, é por processo: com vários
+workers do uvicorn cada um tem os seus baldes e o limite efetivo é multiplicado pelo número de workers. Para um limite
+único entre workers e máquinas, troque o backend por um compartilhado (ex: Redis) que implemente o mesmo 'take':
+
+    login_throttle.backend = MeuBackendRedis(...)
+
+TODOAPP_LOGIN_THROTTLE=0 desliga o limite (os benchmarks fazem isso para logar vários usuários do mesmo IP).
+Atrás de um proxy, rode o uvicorn com '--proxy-headers' para que o IP seja o do cliente e não o do proxy.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol
+
+from fastapi import HTTPException
+from starlette import status
+
+LOGIN_THROTTLE_ENABLED = os.getenv('TODOAPP_LOGIN_THROTTLE', '1') == '1'
+
+LOGIN_USER_BURST = int(os.getenv('TODOAPP_LOGIN_USER_BURST', 5))
+LOGIN_USER_PER_MINUTE = float(os.getenv('TODOAPP_LOGIN_USER_PER_MINUTE', 5))
+LOGIN_IP_BURST = int(os.getenv('TODOAPP_LOGIN_IP_BURST', 20))
+LOGIN_IP_PER_MINUTE = float(os.getenv('TODOAPP_LOGIN_IP_PER_MINUTE', 60))
+
+# Número máximo de baldes guardados em memória; os usados há mais tempo são descartados primeiro (um balde descartado
+# volta cheio, o que só favorece quem não tenta logar há muito tempo).
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv('TODOAPP_LOGIN_THROTTLE_MAX_KEYS', 100_000))
+
+
+class ThrottleBackend(Protocol):
+    async def take(self, key: str, burst: int, per_minute: float) -> float:
+        """Gasta uma ficha do balde 'key'. Devolve 0 se havia ficha, ou quantos segundos faltam para a próxima."""
+
+
+class InMemoryTokenBuckets:
+    def __init__(self, max_keys: int = LOGIN_THROTTLE_MAX_KEYS, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()  # key → (fichas, instante da última atualização)
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, burst: int, per_minute: float) -> float:
+        rate = per_minute / 60
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class LoginThrottle:
+    def __init__(self, backend: ThrottleBackend, enabled: bool = LOGIN_THROTTLE_ENABLED,
+                 user_burst: int = LOGIN_USER_BURST, user_per_minute: float = LOGIN_USER_PER_MINUTE,
+                 ip_burst: int = LOGIN_IP_BURST, ip_per_minute: float = LOGIN_IP_PER_MINUTE):
+        self.backend = backend
+        self.enabled = enabled
+        self.user_burst = user_burst
+        self.user_per_minute = user_per_minute
+        self.ip_burst = ip_burst
+        self.ip_per_minute = ip_per_minute
+        self.rejected = 0
+
+    async def check(self, username: str, client_ip: Optional[str]):
+        """Levanta 429 (com Retry-After) se o username ou o IP já gastaram as tentativas permitidas."""
+        if not self.enabled:
+            return
+
+        # O IP primeiro: numa onda de usernames diferentes vindos do mesmo IP, os baldes dos usernames nem são criados.
+        wait = 0.0
+        if client_ip:
+            wait = await self.backend.take(f'ip:{client_ip}', self.ip_burst, self.ip_per_minute)
+        if not wait:
+            wait = await self.backend.take(f'user:{username.casefold()}', self.user_burst, self.user_per_minute)
+
+        if wait:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail='Too many login attempts',
+                headers={'Retry-After': str(math.ceil(wait))}
+            )
+
+
+login_throttle = LoginThrottle(InMemoryTokenBuckets())
@@ -1,25 +1,64 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 
-from .database import engine
-from .models import Base
+from .database import dispose_engines, get_async_engine
+from .hashing import shutdown_executor
+from .metrics import MetricsMiddleware, metrics
+from .query_stats import QueryStatsMiddleware
 from .routers import admin, auth, todos, users
+from .schema import create_schema_async, create_shard_schemas_async
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+# Opt-in: TODOAPP_ORJSON=1 (com o pacote orjson instalado) troca o json.dumps padrão pelo orjson, bem mais rápido em listas grandes.
+USE_ORJSON = os.getenv('TODOAPP_ORJSON', '0') == '1' and orjson is not None
+
+# Cria as tabelas no startup do servidor (e não no import). Com TODOAPP_CREATE_SCHEMA=0 o passo fica por conta do deploy
+# ('python -m TodoApp.schema' ou 'alembic upgrade head'), e os workers sobem sem tocar no schema.
+CREATE_SCHEMA_ON_STARTUP = os.getenv('TODOAPP_CREATE_SCHEMA', '1') == '1'
 
-app = FastAPI()
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if CREATE_SCHEMA_ON_STARTUP:
+        await create_schema_async(get_async_engine())
+        await create_shard_schemas_async()
+    yield
+    # Desligando: encerra os processos do pool de hash e fecha as conexões de todos os engines.
+    shutdown_executor()
+    await dispose_engines()
 
 """
-models.Base → Aqui você está acessando a variável Base que você criou no seu database.py com:
+lifespan → Código que roda quando o servidor sobe (antes do yield) e quando ele desliga (depois do yield).
 
-.metadata.create_all() → Isso é o que diz ao SQLAlchemy para criar as tabelas no banco de dados, com base nas classes que herdam de Base (ou seja, suas models).
+No desligamento o pool de processos do hashing.py é encerrado (esperando os hashes em andamento) e os pools de conexão
+de todos os engines criados (escrita, leitura e shards) são fechados.
 
-bind=engine → Aqui você está dizendo "Use o banco de dados ao qual esse engine está conectado", que no seu caso é o todos.db (SQLite).
+Importar o main.py não cria engine nem abre o arquivo do banco (ver database.py e schema.py),
+então importar o app é rápido e os testes, que trocam o get_db por um banco de testes, não tocam no todosapp.db.
 """
 
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse if USE_ORJSON else JSONResponse)
+
+# Latência por rota, requisições em andamento e status codes de toda requisição, expostos em /metrics.
+app.add_middleware(MetricsMiddleware)
+# Número de queries e tempo de banco de cada requisição no header Server-Timing.
+app.add_middleware(QueryStatsMiddleware)
+
 @app.get("/healthy")
 def health_check():
     return {'status': 'Healthy'}
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
+
 app.include_router(auth.router)
 app.include_router(todos.router)
 app.include_router(admin.router)
@@ -0,0 +1,138 @@
+"""
+Métricas de produção do TodoApp no formato texto do Prometheus (expostas em '/metrics' pelo main.py).
+
+    - histograma de latência por rota (o template da rota, ex: '/todos/todo/{todo_id}', e não a URL com o id);
+    - contador de requisições por rota e status code;
+    - gauge de requisições em andamento;
+    - checkouts/checkins e conexões em uso do pool de conexões do banco.
+
+O middleware é ASGI puro (sem BaseHTTPMiddleware) e faz só algumas operações de dicionário e um bisect
+por requisição, então pode ficar ligado o tempo todo.
+"""
+
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+
+# Limites (em segundos) dos buckets do histograma de latência.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        # (method, route) -> [contagem por bucket..., +Inf], soma e total
+        self.latency_buckets = {}
+        self.latency_sum = {}
+        self.latency_count = {}
+        # (method, route, status) -> total
+        self.requests_total = {}
+        self.pools = []
+
+    def observe(self, method, route, status_code, duration):
+        key = (method, route)
+        counts = self.latency_buckets.get(key)
+        if counts is None:
+            counts = self.latency_buckets[key] = [0] * (len(self.buckets) + 1)
+            self.latency_sum[key] = 0.0
+            self.latency_count[key] = 0
+        counts[bisect_left(self.buckets, duration)] += 1
+        self.latency_sum[key] += duration
+        self.latency_count[key] += 1
+
+        status_key = (method, route, status_code)
+        self.requests_total[status_key] = self.requests_total.get(status_key, 0) + 1
+
+    def track_pool(self, name, engine):
+        pool_stats = {'name': name, 'checkouts': 0, 'checkins': 0}
+
+        @event.listens_for(engine, 'checkout')
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            pool_stats['checkouts'] += 1
+
+        @event.listens_for(engine, 'checkin')
+        def on_checkin(dbapi_connection, connection_record):
+            pool_stats['checkins'] += 1
+
+        self.pools.append(pool_stats)
+
+    def render(self) -> str:
+        lines = [
+            '# HELP todoapp_http_requests_in_flight Requests currently being served.',
+            '# TYPE todoapp_http_requests_in_flight gauge',
+            f'todoapp_http_requests_in_flight {self.in_flight}',
+            '# HELP todoapp_http_requests_total Requests served, by route and status code.',
+            '# TYPE todoapp_http_requests_total counter',
+        ]
+        for (method, route, status_code), total in sorted(self.requests_total.items()):
+            lines.append(f'todoapp_http_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {total}')
+
+        lines += [
+            '# HELP todoapp_http_request_duration_seconds Request latency, by route.',
+            '# TYPE todoapp_http_request_duration_seconds histogram',
+        ]
+        for (method, route), counts in sorted(self.latency_buckets.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'todoapp_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'todoapp_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative + counts[-1]}')
+            lines.append(f'todoapp_http_request_duration_seconds_sum{{{labels}}} {self.latency_sum[(method, route)]}')
+            lines.append(f'todoapp_http_request_duration_seconds_count{{{labels}}} {self.latency_count[(method, route)]}')
+
+        lines += [
+            '# HELP todoapp_db_pool_checkouts_total Connections checked out of the database pool.',
+            '# TYPE todoapp_db_pool_checkouts_total counter',
+        ]
+        lines += [f'todoapp_db_pool_checkouts_total{{pool="{p["name"]}"}} {p["checkouts"]}' for p in self.pools]
+        lines += [
+            '# HELP todoapp_db_pool_checkins_total Connections returned to the database pool.',
+            '# TYPE todoapp_db_pool_checkins_total counter',
+        ]
+        lines += [f'todoapp_db_pool_checkins_total{{pool="{p["name"]}"}} {p["checkins"]}' for p in self.pools]
+        lines += [
+            '# HELP todoapp_db_pool_checked_out Connections currently in use.',
+            '# TYPE todoapp_db_pool_checked_out gauge',
+        ]
+        lines += [f'todoapp_db_pool_checked_out{{pool="{p["name"]}"}} {p["checkouts"] - p["checkins"]}' for p in self.pools]
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        registry = self.registry
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            registry.in_flight -= 1
+            # O router do Starlette/FastAPI grava a rota encontrada no próprio scope.
+            route = scope.get('route')
+            registry.observe(scope['method'], route.path if route is not None else UNMATCHED_ROUTE, status_code, duration)
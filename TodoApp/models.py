@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, text
 
 from .database import Base
 
@@ -27,3 +27,20 @@ class Todos(Base):
     complete = Column(Boolean, default=False)
     owner_id = Column(Integer, ForeignKey("users.id"))
     
+    # Todas as consultas de um usuário filtram por owner_id. Sem esses índices o SQLite faz um full table scan.
+    # (owner_id, id) atende as buscas por id e a paginação por cursor; (owner_id, complete, priority) as listagens filtradas.
+    __table_args__ = (
+        Index('ix_todos_owner_id_id', 'owner_id', 'id'),
+        Index('ix_todos_owner_id_complete_priority', 'owner_id', 'complete', 'priority'),
+    )
+
+
+# Contadores de todos por (dono, prioridade, status), mantidos pelos triggers de stats.py a cada insert/update/delete em todos.
+# As estatísticas de um usuário somam no máximo 10 linhas daqui, em vez de varrer os todos dele.
+class TodoStats(Base):
+    __tablename__ = 'todo_stats'
+    
+    owner_id = Column(Integer, primary_key=True)
+    priority = Column(Integer, primary_key=True)
+    complete = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, server_default=text('0'))
@@ -0,0 +1,59 @@
+"""
+Paginação por cursor (keyset) para as listagens de todos.
+
+Em vez de 'OFFSET', que obriga o banco a ler e descartar todas as linhas anteriores, a próxima página
+é buscada com 'WHERE id > :after ORDER BY id LIMIT :limit'. Com o índice da chave primária isso custa o mesmo
+na primeira e na milésima página, e nenhuma resposta carrega mais do que 'limit' linhas na memória.
+
+O corpo da resposta continua sendo uma lista (os clientes atuais não quebram) e o cursor da próxima página
+vai no header 'X-Next-Cursor'. Quando não há mais páginas o header não é enviado.
+"""
+
+from fastapi import Query, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(default=DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+        after: int = Query(default=0, ge=0, description='Cursor devolvido no header X-Next-Cursor'),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+async def keyset_page(db, statement, id_column, page: PageParams):
+    # Busca uma linha a mais só para saber se existe uma próxima página.
+    result = await db.execute(
+        statement.where(id_column > page.after).order_by(id_column).limit(page.limit + 1)
+    )
+    rows = result.scalars().all()
+    
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+def merge_pages(pages, limit: int):
+    """
+    Junta as páginas de vários shards (cada uma devolvida por keyset_page com o mesmo cursor) numa página só.
+
+    Cada shard devolveu até 'limit' linhas com id > after: as 'limit' menores entre todas são a página certa.
+    Se sobrou linha (ou algum shard ainda tinha mais), o próximo cursor é o último id da página.
+    """
+    rows = sorted((row for shard_rows, _ in pages for row in shard_rows), key=lambda row: row.id)
+    if len(rows) > limit or any(next_cursor is not None for _, next_cursor in pages):
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+def set_next_cursor(response: Response, next_cursor):
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
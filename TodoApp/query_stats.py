@@ -0,0 +1,99 @@
+"""
+Contagem de queries por requisição e log de queries lentas.
+
+Os eventos do engine (before/after_cursor_execute) medem cada statement SQL enviado ao banco:
+
+    - o número de queries e o tempo total de banco da requisição vão no header 'Server-Timing'
+      (aparece na aba Network do navegador e é fácil de conferir nos testes, ver test/utils.py);
+    - statements mais lentos que TODOAPP_SLOW_QUERY_MS são logados junto com o 'EXPLAIN QUERY PLAN',
+      o que mostra na hora um full table scan ou um índice que não está sendo usado.
+
+A requisição atual é identificada por uma ContextVar, que o asyncio propaga para tudo o que roda dentro dela.
+"""
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+SLOW_QUERY_MS = float(os.getenv('TODOAPP_SLOW_QUERY_MS', 100))
+
+# Só esses statements têm plano de execução que vale a pena olhar (DDL e PRAGMA ficam de fora).
+EXPLAINABLE_PREFIXES = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+logger = logging.getLogger('todoapp.sql')
+
+
+class QueryStats:
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+_current_stats: ContextVar = ContextVar('todoapp_query_stats', default=None)
+
+
+def explain_query_plan(connection, statement, parameters):
+    # Roda num cursor cru do driver, fora dos eventos do SQLAlchemy, para não ser contado (nem medido) de novo.
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def install_query_hooks(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - connection.info['query_start'].pop()
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            plan = None
+            if (connection.dialect.name == 'sqlite' and not executemany
+                    and statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES)):
+                try:
+                    plan = explain_query_plan(connection, statement, parameters)
+                except Exception as e:
+                    plan = f'EXPLAIN failed: {e}'
+            # Os parâmetros não são logados: podem conter dados sensíveis (ex: hashed_password).
+            logger.warning('Slow query (%.1f ms): %s | plan: %s', elapsed * 1000, statement, plan)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = [*message.get('headers', []), (b'server-timing', stats.server_timing().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
@@ -1,48 +1,109 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from starlette import status
 
-from ..database import SessionLocal
+from .. import database
+from ..export import EXPORT_MEDIA_TYPES, stream_todos
 from ..models import Todos
+from ..pagination import PageParams, keyset_page, merge_pages, set_next_cursor
+from ..stats import all_stats_rows, summarize_all
+from ..todo_cache import todo_list_cache
 from .auth import get_current_user
+from .todos import TodoResponse, TodoStatsResponse
 
 router = APIRouter(
     prefix='/admin',
     tags=['admin']
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally: 
-        db.close()
+def get_shard_sessionmakers():
+    # Uma fábrica de sessões por shard (database.SHARD_COUNT): as rotas de admin enxergam os todos de todos os usuários.
+    return database.shard_sessionmakers()
+
+def get_shard_read_sessionmakers():
+    # As mesmas, ligadas aos engines somente leitura. A exportação abre as sessões só quando o corpo da resposta
+    # começa a ser enviado (ver export.py), por isso recebe as fábricas e não sessões já abertas.
+    return database.shard_sessionmakers(read=True)
+        
+class OwnerStatsResponse(TodoStatsResponse):
+    owner_id: int
+    
+class AdminStatsResponse(TodoStatsResponse):
+    by_owner: list[OwnerStatsResponse]
         
-db_dependency = Annotated[Session, Depends(get_db)]
+sessionmakers_dependency = Annotated[list[async_sessionmaker], Depends(get_shard_sessionmakers)]
+read_sessionmakers_dependency = Annotated[list[async_sessionmaker], Depends(get_shard_read_sessionmakers)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
+page_dependency = Annotated[PageParams, Depends()]
+
+@router.get("/todo", status_code=status.HTTP_200_OK, response_model=list[TodoResponse])
+async def read_all(
+    user: user_dependency,
+    sessionmakers: read_sessionmakers_dependency,
+    page: page_dependency,
+    response: Response
+):
+    if user is None or user.get('user_role') != 'admin':
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    # A mesma página (id > after) em todos os shards ao mesmo tempo; merge_pages fica com os 'limit' menores ids.
+    pages = await database.fan_out(sessionmakers, lambda db: keyset_page(db, select(Todos), Todos.id, page))
+    todos, next_cursor = merge_pages(pages, page.limit)
+    set_next_cursor(response, next_cursor)
+    
+    return todos
+
+@router.get("/todo/export", status_code=status.HTTP_200_OK)
+async def export_todos(
+    user: user_dependency,
+    sessionmakers: read_sessionmakers_dependency,
+    format: Literal['ndjson', 'csv'] = Query(default='ndjson'),
+):
+    if user is None or user.get('user_role') != 'admin':
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    return StreamingResponse(
+        stream_todos(sessionmakers, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="todos.{format}"'}
+    )
 
-@router.get("/todo", status_code=status.HTTP_200_OK)
-async def read_all(user: user_dependency, db: db_dependency):
-    if user is None or user.get('role') != 'admin':
+@router.get("/stats", status_code=status.HTTP_200_OK, response_model=AdminStatsResponse)
+async def read_stats(user: user_dependency, sessionmakers: read_sessionmakers_dependency):
+    if user is None or user.get('user_role') != 'admin':
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    return db.query(Todos).all()
+    # Soma os contadores da todo_stats (algumas linhas por usuário) de cada shard, sem varrer a tabela todos.
+    shard_rows = await database.fan_out(sessionmakers, all_stats_rows)
+    return summarize_all(sorted((row for rows in shard_rows for row in rows), key=lambda row: row.owner_id))
 
 @router.delete("/todo/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_todo(user: user_dependency, db: db_dependency, todo_id: int = Path(gt=0)):
-    if user is None or user.get('role') != 'admin':
+async def delete_todo(user: user_dependency, sessionmakers: sessionmakers_dependency, todo_id: int = Path(gt=0)):
+    if user is None or user.get('user_role') != 'admin':
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    todo_model = db.query(Todos).filter(
-        Todos.id == todo_id
-    ).first()
+    # Um único 'DELETE ... RETURNING owner_id' em cada shard, ao mesmo tempo: os ids não se repetem entre shards
+    # (ver database.shard_id_start), então no máximo um deles apaga alguma coisa. O 404 vem de nenhum shard devolver linha,
+    # sem um SELECT antes, e o owner_id devolvido diz qual cache de listagem invalidar.
+    async def delete_from_shard(db):
+        owner_id = await db.scalar(
+            delete(Todos)
+            .where(Todos.id == todo_id)
+            .returning(Todos.owner_id)
+            .execution_options(synchronize_session=False)
+        )
+        if owner_id is not None:
+            await db.commit()
+        return owner_id
     
-    if todo_model is None:
-        raise HTTPException(status_code=404, detail='Todo not found')
+    owner_ids = [owner_id for owner_id in await database.fan_out(sessionmakers, delete_from_shard) if owner_id is not None]
     
-    db.query(Todos).filter(Todos.id == todo_id).delete()
+    if not owner_ids:
+        raise HTTPException(status_code=404, detail='Todo not found')
     
-    db.commit()
\ No newline at end of file
+    todo_list_cache.invalidate(owner_ids[0])
@@ -1,16 +1,22 @@
+import logging
 from datetime import datetime, timedelta, timezone
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
 from starlette import status
 
-from ..database import SessionLocal
+from ..deps import db_dependency, read_db_dependency
+from ..hashing import bcrypt_context, hash_password, needs_rehash, verify_password
+from ..login_throttle import login_throttle
 from ..models import Users
+from ..token_cache import token_cache
+
+logger = logging.getLogger('todoapp.auth')
 
 router = APIRouter(
     prefix='/auth',
@@ -24,13 +30,6 @@ SECRET_KEY = 'ea4927993a91ad9b415ed3b64f5f6c0d50e62d39d7a1a69d210a961af9949a78'
 ALGORITHM = 'HS256'
 
 
-# Define que usaremos bcrypt para hash de senha.
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
-"""
-    bcrypt_context.hash(...) cria um hash.
-    bcrypt_context.verify(...) compara senha crua com o hash armazenado.
-"""
-
 # Indica que a autenticação será feita via Bearer token (JWT).
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl='auth/token')
 """
@@ -45,32 +44,59 @@ class CreateUserRequest(BaseModel):
     password: str
     role: str
     phone_number: str
+    
+# Formato de resposta dos dados do usuário: nunca inclui o hashed_password.
+class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    role: str
+    is_active: bool
+    phone_number: Optional[str]
 
 # Define o formato de resposta da rota de login: token JWT + tipo ("bearer").
 class Token(BaseModel):
     access_token:str
     token_type: str
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally: 
-        db.close()
-        
-db_dependency = Annotated[Session, Depends(get_db)]
-
-def authenticate_user(username: str, password: str, db):
-    user = db.query(Users).filter(
-        Users.username == username
-    ).first()
+async def authenticate_user(username: str, password: str, db, write_db=None):
+    """
+    db → sessão da busca do usuário (no login, a de somente leitura).
+    write_db → sessão usada só para gravar o hash refeito (padrão: a própria db).
+    """
+    user = await db.scalar(select(Users).where(Users.username == username))
     
     if not user:
         return False
     
-    if not bcrypt_context.verify(password, user.hashed_password):
+    # Encerra a transação antes do bcrypt: a conexão volta ao pool em vez de ficar presa ~250 ms por login.
+    # O expunge tira o usuário da sessão, então o rollback não expira os atributos já carregados.
+    db.expunge(user)
+    await db.rollback()
+    
+    # O verify roda no pool de processos do hashing.py, sem travar o event loop.
+    if not await verify_password(password, user.hashed_password):
         return False
     
+    # Hash gravado com outro custo (TODOAPP_BCRYPT_ROUNDS mudou): só aqui a senha em texto puro está disponível,
+    # então é aqui que o hash é refeito com o custo atual. Só este UPDATE usa a sessão de escrita.
+    # Se a gravação falhar o login segue valendo; o hash é refeito num próximo login.
+    if needs_rehash(user.hashed_password):
+        write_db = write_db if write_db is not None else db
+        new_hash = await hash_password(password)
+        try:
+            await write_db.execute(update(Users).where(Users.id == user.id).values(hashed_password=new_hash))
+            await write_db.commit()
+        except SQLAlchemyError:
+            logger.warning('Could not rehash password of user %s', username, exc_info=True)
+            await write_db.rollback()
+        else:
+            user.hashed_password = new_hash
+    
     return user
 
 def create_acess_token(username: str, user_id: int, role: str, expires_delta: timedelta):
@@ -127,6 +153,11 @@ def create_acess_token(username: str, user_id: int, role: str, expires_delta: ti
 
 # Define uma função assíncrona que recupera o usuário atual com base no token JWT enviado pelo cliente
 async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
+    # Token já verificado antes e ainda dentro do 'exp': não precisa decodificar de novo.
+    claims = token_cache.get(token)
+    if claims is not None:
+        return dict(claims)
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get('sub')
@@ -136,14 +167,17 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
         if username is None or user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user')
         
-        return {'username': username, 'id': user_id, 'user_role': user_role}
+        claims = {'username': username, 'id': user_id, 'user_role': user_role}
+        token_cache.set(token, claims, payload.get('exp'))
+        
+        return dict(claims)
     
     except JWTError as e:
         print(f'Erro no JWT: {str(e)}')  # ou use logging
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user')
      
         
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=UserResponse)
 async def create_user(create_user_request: CreateUserRequest, db: db_dependency):
     create_user_model = Users(
         email=create_user_request.email,
@@ -151,13 +185,13 @@ async def create_user(create_user_request: CreateUserRequest, db: db_dependency)
         first_name=create_user_request.first_name,
         last_name=create_user_request.last_name,
         role=create_user_request.role,
-        hashed_password=bcrypt_context.hash(create_user_request.password),
+        hashed_password=await hash_password(create_user_request.password),
         is_active=True,
         phone_number=create_user_request.phone_number
     )
     
     db.add(create_user_model)
-    db.commit()
+    await db.commit()
     
     
     return create_user_model
@@ -170,9 +204,15 @@ Se você tentar passar isso diretamente para Users(**...), o Python tentaria enc
 @router.post("/token", response_model=Token)
 async def login_for_acess_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()], 
-    db: db_dependency
+    read_db: read_db_dependency,
+    db: db_dependency,
+    request: Request
 ):
-    user = authenticate_user(form_data.username, form_data.password, db)
+    # Tentativas demais do mesmo username ou IP viram 429 aqui, antes do banco e do bcrypt (ver login_throttle.py).
+    await login_throttle.check(form_data.username, request.client.host if request.client else None)
+    
+    # A busca do usuário vai para o pool de leitura; a sessão de escrita só pega uma conexão se o hash for refeito.
+    user = await authenticate_user(form_data.username, form_data.password, read_db, db)
     if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user 3')
     
@@ -1,12 +1,19 @@
-from typing import Annotated
+import os
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path
-from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, Query, Response
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from ..database import SessionLocal
+from .. import database
+from ..deps import request_sessions_dependency
 from ..models import Todos
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, keyset_page, set_next_cursor
+from ..search import match_expression, search_statement
+from ..stats import owner_stats
+from ..todo_cache import etag_matches, todo_list_cache
 from .auth import get_current_user
 
 router = APIRouter(
@@ -15,21 +22,29 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally: 
-        db.close()
+async def get_db(user: Annotated[dict, Depends(get_current_user)], sessions: request_sessions_dependency):
+    # Os todos de um usuário ficam todos no mesmo shard (ver database.SHARD_COUNT); com um shard só é o todosapp.db.
+    return sessions.get(database.todo_sessionmaker(user['id'] if user else 0))
+
+
+async def get_read_db(user: Annotated[dict, Depends(get_current_user)], sessions: request_sessions_dependency):
+    # Sessão do engine somente leitura do shard, para as rotas GET: não disputa o pool pequeno de escrita.
+    return sessions.get(database.todo_sessionmaker(user['id'] if user else 0, read=True))
         
 """
-É um gerador Python que o FastAPI vai usar para fazer injeção de dependência de banco de dados nos endpoints.
+São as dependências que o FastAPI usa para injetar a sessão de banco de dados nos endpoints.
+
+async def get_db(user, sessions)   →   Definindo a função (assíncrona, porque a sessão é assíncrona)
+user	→   O usuário do token (get_current_user). Um token inválido vira 401 antes de qualquer sessão ser criada.
+sessions	→   As sessões da requisição (deps.get_request_sessions), compartilhadas com as outras dependências.
+sessions.get(database.todo_sessionmaker(...))	→   A sessão do shard do usuário: criada na primeira vez que é pedida,
+    e a conexão só sai do pool na primeira query.
+    O engine e a fábrica de sessões são criados no primeiro acesso (ver database.py), não quando o app é importado.
+
+Quem fecha a sessão é o get_request_sessions, que é um gerador:
 
-def get_db():   →   Definindo a função
-db = SessionLocal() →   Abre uma nova sessão de banco (uma conexão temporária)
-try:	→   Começo de um bloco de segurança
-yield db	→   "Entregue essa sessão para quem chamou essa função (normalmente o FastAPI num endpoint)"
-finally: db.close()	→   Após o uso da sessão, feche a conexão, para evitar vazamentos de recursos
+yield sessions	→   "Entregue as sessões para quem chamou essa função (normalmente o FastAPI num endpoint)"
+depois do yield	→   Quando a requisição termina, as sessões são fechadas, para evitar vazamentos de recursos
 
 Diferença rápida entre return e yield:
 return	
@@ -47,9 +62,40 @@ class TodoRequest(BaseModel):
     priority: int = Field(gt=0, lt=6)
     complete: bool
     
+class TodoResponse(BaseModel):
+    # from_attributes: permite montar o modelo direto de um objeto do SQLAlchemy (lendo os atributos, e não um dict).
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    title: str
+    description: str
+    priority: int
+    complete: bool
+    owner_id: Optional[int]
+    
+# Valida/serializa a lista inteira de uma vez no pydantic-core (Rust), sem passar pelo jsonable_encoder.
+todo_list_adapter = TypeAdapter(list[TodoResponse])
+    
+
+class TodoStatsResponse(BaseModel):
+    total: int
+    completed: int
+    completion_rate: float
+    by_priority: dict[int, int]
+    
+
+# Tamanho máximo de cada lote dos endpoints /todos/bulk (acima disso a requisição recebe 422).
+BULK_MAX_ITEMS = int(os.getenv('TODOAPP_BULK_MAX_ITEMS', 500))
+
+class TodoBulkUpdateRequest(TodoRequest):
+    id: int = Field(gt=0)
+    
+class BulkItemResult(BaseModel):
+    id: Optional[int]
+    status_code: int
         
         
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 """
 O Annotated faz parte da tipagem moderna do Python (vem do módulo typing).
 
@@ -59,32 +105,91 @@ No FastAPI, o uso mais comum de Annotated é quando você quer dizer o tipo de u
 
 db_dependency	→   Nome da variável (só um apelido, poderia ser qualquer nome)
 Annotated[...]	→   Define um tipo + metadados
-Session	→   Tipo de dado que o FastAPI vai injetar (no caso, uma sessão SQLAlchemy)
+AsyncSession	→   Tipo de dado que o FastAPI vai injetar (no caso, uma sessão assíncrona do SQLAlchemy)
 Depends(get_db)	→ Diz ao FastAPI: "Para preencher isso, use a dependência get_db()
 """
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
+page_dependency = Annotated[PageParams, Depends()]
 
-@router.get("/")
-async def read_all(user: user_dependency, db: db_dependency):
+@router.get("/", response_model=list[TodoResponse])
+async def read_all(
+    user: user_dependency,
+    db: read_db_dependency,
+    page: page_dependency,
+    if_none_match: Annotated[Optional[str], Header()] = None
+):
     
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    return db.query(Todos).filter(Todos.owner_id == user.get('id')).all()
+    owner_id = user.get('id')
+    cache_key = (page.after, page.limit)
+    
+    cached_page = todo_list_cache.get(owner_id, cache_key)
+    if cached_page is None:
+        generation = todo_list_cache.generation(owner_id)
+        todos, next_cursor = await keyset_page(
+            db, select(Todos).where(Todos.owner_id == owner_id), Todos.id, page
+        )
+        cached_page = todo_list_cache.put(owner_id, cache_key, serialize_todos(todos), next_cursor, generation)
+    
+    # O cliente já tem exatamente esse conteúdo: 304 sem corpo.
+    if etag_matches(if_none_match, cached_page.etag):
+        response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(content=cached_page.body, media_type='application/json')
+    
+    response.headers['ETag'] = cached_page.etag
+    set_next_cursor(response, cached_page.next_cursor)
+    
+    return response
 
 
+def serialize_todos(todos) -> bytes:
+    return todo_list_adapter.dump_json(todo_list_adapter.validate_python(todos, from_attributes=True))
 
-@router.get("/todo/{todo_id}", status_code=status.HTTP_200_OK)
-async def read_todo(user: user_dependency, db: db_dependency, todo_id: int = Path(gt=0)):
+
+@router.get("/search", status_code=status.HTTP_200_OK, response_model=list[TodoResponse])
+async def search_todos(
+    user: user_dependency,
+    db: read_db_dependency,
+    q: str = Query(min_length=1, max_length=200, description="Palavras buscadas no título e na descrição ('palavra*' busca por prefixo)"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0),
+):
     
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    todo_model = db.query(Todos).filter(
-        Todos.id == todo_id
-    ).filter(
-        Todos.owner_id == user.get('id')
-    ).first()
+    # Os mais relevantes primeiro (bm25). A ordem é por relevância, não por id, por isso aqui a paginação é por offset.
+    expression = match_expression(user.get('id'), q)
+    if expression is None:
+        return []
+    
+    result = await db.execute(search_statement(user.get('id'), expression, limit, offset))
+    return result.scalars().all()
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK, response_model=TodoStatsResponse)
+async def read_stats(user: user_dependency, db: read_db_dependency):
+    
+    if user is None:
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    # Lê os contadores da todo_stats (no máximo 10 linhas), não importa quantos todos o usuário tenha.
+    return await owner_stats(db, user.get('id'))
+
+
+@router.get("/todo/{todo_id}", status_code=status.HTTP_200_OK, response_model=TodoResponse)
+async def read_todo(user: user_dependency, db: read_db_dependency, todo_id: int = Path(gt=0)):
+    
+    if user is None:
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    todo_model = await db.scalar(
+        select(Todos).where(Todos.id == todo_id).where(Todos.owner_id == user.get('id'))
+    )
     
     if todo_model is not None:
         return todo_model
@@ -101,7 +206,9 @@ async def create_todo(user: user_dependency, db: db_dependency, todo_request: To
     todo_model = Todos(**todo_request.model_dump(), owner_id=user.get('id'))
     
     db.add(todo_model)
-    db.commit()
+    await db.commit()
+    
+    todo_list_cache.invalidate(user.get('id'))
     
 @router.put("/todo/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_todo(user: user_dependency, db: db_dependency, todo_request: TodoRequest, todo_id: int = Path(gt=0)):
@@ -109,38 +216,120 @@ async def update_todo(user: user_dependency, db: db_dependency, todo_request: To
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    todo_model = db.query(Todos).filter(
-        Todos.id == todo_id
-    ).filter(
-        Todos.owner_id == user.get('id')    
-    ).first()
+    # Um único 'UPDATE ... WHERE id = ? AND owner_id = ?': se nenhuma linha foi afetada o todo não existe (ou é de outro usuário).
+    result = await db.execute(
+        update(Todos)
+        .where(Todos.id == todo_id)
+        .where(Todos.owner_id == user.get('id'))
+        .values(**todo_request.model_dump())
+        .execution_options(synchronize_session=False)
+    )
     
-    if todo_model is None:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail='Todo not found')
     
-    todo_model.title = todo_request.title
-    todo_model.description = todo_request.description
-    todo_model.priority = todo_request.priority
-    todo_model.complete = todo_request.complete
+    await db.commit()
     
-    db.add(todo_model)
-    db.commit()
+    todo_list_cache.invalidate(user.get('id'))
     
 @router.delete("/todo/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delte_todo(user: user_dependency, db: db_dependency, todo_id: int = Path(gt=0)):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    todo_model = db.query(Todos).filter(
-        Todos.id == todo_id
-    ).filter(
-        Todos.owner_id == user.get('id')    
-    ).first()
+    result = await db.execute(
+        delete(Todos)
+        .where(Todos.id == todo_id)
+        .where(Todos.owner_id == user.get('id'))
+        .execution_options(synchronize_session=False)
+    )
     
-    if todo_model is None:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail='Todo not found')
     
-    db.query(Todos).filter(Todos.id == todo_id).filter(Todos.owner_id == user.get('id')).delete()
+    await db.commit()
+    
+    todo_list_cache.invalidate(user.get('id'))
+
+
+"""
+Endpoints em lote (bulk)
+
+Um cliente sincronizando 500 todos faria 500 requisições, cada uma com seu próprio commit (um fsync por todo).
+Aqui o lote inteiro roda numa única transação, com um único commit, e a resposta traz o resultado de cada item na mesma ordem do pedido.
+"""
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=list[BulkItemResult])
+async def create_todos_bulk(
+    user: user_dependency,
+    db: db_dependency,
+    todo_requests: Annotated[list[TodoRequest], Body(min_length=1, max_length=BULK_MAX_ITEMS)]
+):
+    if user is None:
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    # Uma lista de parâmetros no execute vira um INSERT em lote (executemany / multi-VALUES) com RETURNING dos ids.
+    todo_ids = await db.scalars(
+        insert(Todos).returning(Todos.id, sort_by_parameter_order=True),
+        [{**todo_request.model_dump(), 'owner_id': user.get('id')} for todo_request in todo_requests]
+    )
+    results = [{'id': todo_id, 'status_code': status.HTTP_201_CREATED} for todo_id in todo_ids]
+    
+    await db.commit()
+    
+    todo_list_cache.invalidate(user.get('id'))
+    
+    return results
+    
+@router.put("/bulk", status_code=status.HTTP_200_OK, response_model=list[BulkItemResult])
+async def update_todos_bulk(
+    user: user_dependency,
+    db: db_dependency,
+    todo_requests: Annotated[list[TodoBulkUpdateRequest], Body(min_length=1, max_length=BULK_MAX_ITEMS)]
+):
+    if user is None:
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    results = []
+    for todo_request in todo_requests:
+        result = await db.execute(
+            update(Todos)
+            .where(Todos.id == todo_request.id)
+            .where(Todos.owner_id == user.get('id'))
+            .values(**todo_request.model_dump(exclude={'id'}))
+            .execution_options(synchronize_session=False)
+        )
+        status_code = status.HTTP_204_NO_CONTENT if result.rowcount else status.HTTP_404_NOT_FOUND
+        results.append({'id': todo_request.id, 'status_code': status_code})
+    
+    await db.commit()
+    
+    todo_list_cache.invalidate(user.get('id'))
+    
+    return results
+    
+@router.delete("/bulk", status_code=status.HTTP_200_OK, response_model=list[BulkItemResult])
+async def delete_todos_bulk(
+    user: user_dependency,
+    db: db_dependency,
+    todo_ids: Annotated[list[Annotated[int, Field(gt=0)]], Body(min_length=1, max_length=BULK_MAX_ITEMS)]
+):
+    if user is None:
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    deleted_ids = set(await db.scalars(
+        delete(Todos)
+        .where(Todos.id.in_(todo_ids))
+        .where(Todos.owner_id == user.get('id'))
+        .returning(Todos.id)
+        .execution_options(synchronize_session=False)
+    ))
+    
+    await db.commit()
+    
+    todo_list_cache.invalidate(user.get('id'))
     
-    db.commit()
-    
\ No newline at end of file
+    return [
+        {'id': todo_id, 'status_code': status.HTTP_204_NO_CONTENT if todo_id in deleted_ids else status.HTTP_404_NOT_FOUND}
+        for todo_id in todo_ids
+    ]
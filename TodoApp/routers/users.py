@@ -2,26 +2,19 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Path
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from starlette import status
 
-from ..database import SessionLocal
+from ..deps import db_dependency, read_db_dependency
+from ..hashing import hash_password, verify_password
 from ..models import Users
-from .auth import bcrypt_context, get_current_user
+from .auth import UserResponse, get_current_user
 
 router = APIRouter(
     prefix='/users',
     tags=['users']
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally: 
-        db.close()
-        
-db_dependency = Annotated[Session, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 class UserVerification(BaseModel):
@@ -30,15 +23,16 @@ class UserVerification(BaseModel):
     
 
 
-@router.get("/", status_code=status.HTTP_200_OK)
-async def get_user(user: user_dependency, db: db_dependency):
+@router.get("/", status_code=status.HTTP_200_OK, response_model=UserResponse)
+async def get_user(user: user_dependency, db: read_db_dependency):
     
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    user_model = db.query(Users).filter(
-        Users.id == user.get('id')
-    ).first()  
+    user_model = await db.scalar(select(Users).where(Users.id == user.get('id')))
+    # Token válido de um usuário que não existe mais: com o response_model, devolver None viraria um 500.
+    if user_model is None:
+        raise HTTPException(status_code=404, detail='User not found')
     
     return user_model
     
@@ -48,16 +42,18 @@ async def change_password(user: user_dependency, db: db_dependency, user_verific
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    user_model = db.query(Users).filter(Users.id == user.get('id')).first()
+    user_model = await db.scalar(select(Users).where(Users.id == user.get('id')))
+    # Devolve a conexão de escrita ao pool durante os dois bcrypts (verify + hash); o UPDATE abre outra transação no commit.
+    await db.commit()
     
-    if not bcrypt_context.verify(user_verification.password, user_model.hashed_password):
+    if not await verify_password(user_verification.password, user_model.hashed_password):
         raise HTTPException(status_code=401, detail='Error on password change')
     
-    user_model.hashed_password = bcrypt_context.hash(user_verification.new_password)
+    user_model.hashed_password = await hash_password(user_verification.new_password)
     
     db.add(user_model)
     
-    db.commit()
+    await db.commit()
     
 @router.put("/phonenumber/{phone_number}", status_code=status.HTTP_204_NO_CONTENT)
 async def change_phone_number(user: user_dependency, db: db_dependency, phone_number: str):
@@ -65,10 +61,10 @@ async def change_phone_number(user: user_dependency, db: db_dependency, phone_nu
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    user_model = db.query(Users).filter(Users.id == user.get('id')).first()
+    user_model = await db.scalar(select(Users).where(Users.id == user.get('id')))
     user_model.phone_number = phone_number
     db.add(user_model)
-    db.commit()
+    await db.commit()
  
     
     
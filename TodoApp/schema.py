@@ -0,0 +1,93 @@
+"""
+Criação das tabelas do banco, como um passo explícito (e não um efeito colateral de importar o app).
+
+Roda no startup do app (lifespan do main.py, desligável com TODOAPP_CREATE_SCHEMA=0) ou uma única vez pela linha de comando,
+antes de subir os workers:
+
+    python -m TodoApp.schema
+
+Se o banco já tem a tabela 'alembic_version', o schema é das migrations do Alembic ('alembic upgrade head')
+e nada é criado aqui, para o create_all não criar por fora tabelas ou índices que a próxima migration vai tentar criar de novo.
+
+Com TODOAPP_SHARD_COUNT > 1 os arquivos dos shards 1..N-1 ganham só as tabelas dos todos (create_shard_schema).
+Eles não são gerenciados pelo Alembic.
+"""
+
+import logging
+
+from sqlalchemy import MetaData, inspect
+
+from . import database
+from .models import Base, TodoStats, Todos, Users
+from .search import create_todo_search  # noqa: F401 (registra a criação do todos_fts no create_all)
+from .stats import create_todo_stats_triggers  # noqa: F401 (registra os triggers da todo_stats no create_all)
+
+logger = logging.getLogger('todoapp.schema')
+
+ALEMBIC_VERSION_TABLE = 'alembic_version'
+
+
+def create_schema(connection) -> bool:
+    """
+    Cria as tabelas que ainda não existem. Devolve False quando o banco é gerenciado pelo Alembic.
+
+    Recebe uma Connection síncrona; com o engine assíncrono use 'await connection.run_sync(create_schema)'.
+    """
+    if inspect(connection).has_table(ALEMBIC_VERSION_TABLE):
+        logger.info('Database managed by Alembic, skipping create_all (run "alembic upgrade head")')
+        return False
+
+    Base.metadata.create_all(bind=connection)
+    """
+    Base.metadata → Os metadados de todas as classes que herdam de Base (ou seja, suas models).
+
+    .create_all() → Isso é o que diz ao SQLAlchemy para criar as tabelas no banco de dados.
+        Tabelas que já existem não são recriadas (ele confere antes), então rodar de novo é seguro.
+
+    bind=connection → "Use o banco de dados ao qual essa conexão aponta", que no seu caso é o todosapp.db (SQLite).
+    """
+    return True
+
+
+async def create_schema_async(async_engine):
+    async with async_engine.begin() as connection:
+        return await connection.run_sync(create_schema)
+
+
+def create_shard_schema(connection, shard: int):
+    """
+    Cria num arquivo de shard as tabelas dos todos (todos, todo_stats, todos_fts e os triggers). A tabela users fica só no shard 0.
+
+    A todos do shard usa AUTOINCREMENT, e o sqlite_sequence começa em shard_id_start(shard): os ids gerados ali
+    não colidem com os de nenhum outro shard, e o admin pode apagar um todo pelo id sem saber em que shard ele está.
+    """
+    metadata = MetaData()
+    Users.__table__.to_metadata(metadata)  # só para resolver a FK owner_id → users.id; a tabela não é criada
+    todos = Todos.__table__.to_metadata(metadata)
+    todos.dialect_kwargs['sqlite_autoincrement'] = True
+    metadata.create_all(bind=connection, tables=[todos, TodoStats.__table__.to_metadata(metadata)])
+
+    create_todo_search(metadata, connection)
+    create_todo_stats_triggers(metadata, connection)
+    connection.exec_driver_sql(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'todos', ? "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'todos')",
+        (database.shard_id_start(shard),)
+    )
+
+
+async def create_shard_schemas_async():
+    for shard in range(1, database.SHARD_COUNT):
+        async with database.get_shard_async_engine(shard).begin() as connection:
+            await connection.run_sync(create_shard_schema, shard)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    with database.get_engine().begin() as connection:
+        if create_schema(connection):
+            print('Schema created')
+    for shard in range(1, database.SHARD_COUNT):
+        with database.get_shard_engine(shard).begin() as connection:
+            create_shard_schema(connection, shard)
+        print(f'Shard {shard} schema created')
@@ -0,0 +1,96 @@
+"""
+Busca full-text nos todos (título e descrição) com o FTS5 do SQLite.
+
+todos_fts é uma tabela virtual FTS5 de conteúdo externo: ela guarda só o índice invertido e lê o texto da própria tabela todos.
+Três triggers (insert/update/delete em todos) mantêm o índice em dia, então nenhuma rota precisa lembrar de atualizá-lo,
+nem os UPDATE/DELETE em massa (bulk) que não passam pelo ORM.
+
+O owner_id também é indexado como token. A busca vira 'owner_id : "7" AND {title description} : (...)',
+e o próprio FTS5 cruza as listas de documentos do dono e dos termos: o custo depende dos todos daquele usuário que
+contêm os termos, não do tamanho da tabela inteira.
+
+Bancos novos ganham a tabela e os triggers no create_all (ver create_todo_search). Bancos gerenciados pelo Alembic
+ganham pela migration 'create todos_fts', que também indexa os todos que já existem.
+"""
+
+import re
+
+from sqlalchemy import column, event, func, inspect, literal_column, select, table
+
+from .models import Base, Todos
+
+TODO_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5("
+    "title, description, owner_id, content='todos', content_rowid='id')",
+
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_ai AFTER INSERT ON todos BEGIN "
+    "INSERT INTO todos_fts(rowid, title, description, owner_id) VALUES (new.id, new.title, new.description, new.owner_id); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_ad AFTER DELETE ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) "
+    "VALUES ('delete', old.id, old.title, old.description, old.owner_id); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_au AFTER UPDATE OF title, description, owner_id ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) "
+    "VALUES ('delete', old.id, old.title, old.description, old.owner_id); "
+    "INSERT INTO todos_fts(rowid, title, description, owner_id) VALUES (new.id, new.title, new.description, new.owner_id); "
+    "END",
+)
+
+# Peso de cada coluna no bm25: o título vale mais que a descrição e o owner_id (que só filtra) não conta.
+BM25_WEIGHTS = (10.0, 5.0, 0.0)
+
+todos_fts = table('todos_fts', column('rowid'))
+
+_TERM = re.compile(r'[^\s"]+\*?')
+
+
+def create_todo_search(target, connection, **kw):
+    """
+    Listener do 'after_create' do metadata: roda depois de todo create_all, inclusive quando as tabelas já existiam.
+
+    Se a tabela todos_fts ainda não existia, o 'rebuild' indexa os todos que já estão no banco.
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+
+    existed = inspect(connection).has_table('todos_fts')
+    for ddl in TODO_SEARCH_DDL:
+        connection.exec_driver_sql(ddl)
+    if not existed:
+        connection.exec_driver_sql("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+
+
+event.listen(Base.metadata, 'after_create', create_todo_search)
+
+
+def match_expression(owner_id: int, q: str):
+    """
+    Monta a expressão do MATCH a partir do texto digitado pelo usuário.
+
+    Cada palavra vira uma string entre aspas (assim operadores e caracteres especiais do FTS5 não geram erro de sintaxe)
+    e todas precisam aparecer no todo. Uma palavra terminada em '*' busca por prefixo (ex: 'compr*' acha 'compras').
+    Devolve None quando não sobra nenhuma palavra.
+    """
+    terms = [
+        f'"{term[:-1]}"*' if term.endswith('*') else f'"{term}"'
+        for term in _TERM.findall(q)
+        if term.rstrip('*')
+    ]
+    if not terms:
+        return None
+    return f'owner_id : "{int(owner_id)}" AND {{title description}} : ({" AND ".join(terms)})'
+
+
+def search_statement(owner_id: int, expression: str, limit: int, offset: int):
+    return (
+        select(Todos)
+        .join(todos_fts, todos_fts.c.rowid == Todos.id)
+        .where(literal_column('todos_fts').op('MATCH')(expression))
+        .where(Todos.owner_id == owner_id)
+        .order_by(func.bm25(literal_column('todos_fts'), *BM25_WEIGHTS))
+        .limit(limit)
+        .offset(offset)
+    )
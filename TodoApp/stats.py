@@ -0,0 +1,107 @@
+"""
+Estatísticas dos todos (total, concluídos e contagem por prioridade) lidas de contadores, sem varrer a tabela todos.
+
+A tabela todo_stats (models.TodoStats) tem um contador por (owner_id, priority, complete).
+Triggers em todos atualizam os contadores na mesma transação de cada insert/update/delete, então eles valem para
+todas as rotas (todos, bulk e admin) sem que nenhuma delas precise lembrar de atualizá-los.
+
+Bancos novos ganham os triggers no create_all (ver create_todo_stats_triggers). Bancos gerenciados pelo Alembic
+ganham pela migration 'create todo_stats', que também conta os todos que já existem.
+"""
+
+from sqlalchemy import event, select
+
+from .models import Base, TodoStats
+
+# Colunas nulas viram 0 (um NULL na chave primária nunca conflita e criaria linhas duplicadas).
+_NEW_KEY = 'coalesce(new.owner_id, 0), coalesce(new.priority, 0), coalesce(new.complete, 0)'
+_OLD_KEY_MATCH = (
+    'owner_id = coalesce(old.owner_id, 0) AND priority = coalesce(old.priority, 0) AND complete = coalesce(old.complete, 0)'
+)
+_INCREMENT_NEW = (
+    f'INSERT INTO todo_stats(owner_id, priority, complete, count) VALUES ({_NEW_KEY}, 1) '
+    'ON CONFLICT(owner_id, priority, complete) DO UPDATE SET count = count + 1; '
+)
+_DECREMENT_OLD = f'UPDATE todo_stats SET count = count - 1 WHERE {_OLD_KEY_MATCH}; '
+
+TODO_STATS_TRIGGERS = (
+    f'CREATE TRIGGER IF NOT EXISTS todo_stats_ai AFTER INSERT ON todos BEGIN {_INCREMENT_NEW}END',
+    f'CREATE TRIGGER IF NOT EXISTS todo_stats_ad AFTER DELETE ON todos BEGIN {_DECREMENT_OLD}END',
+    # O update_todo grava todas as colunas; o WHEN pula os updates que não mudam a chave do contador.
+    'CREATE TRIGGER IF NOT EXISTS todo_stats_au AFTER UPDATE OF owner_id, priority, complete ON todos '
+    'WHEN old.owner_id IS NOT new.owner_id OR old.priority IS NOT new.priority OR old.complete IS NOT new.complete '
+    f'BEGIN {_DECREMENT_OLD}{_INCREMENT_NEW}END',
+)
+
+TODO_STATS_BACKFILL = (
+    'DELETE FROM todo_stats',
+    'INSERT INTO todo_stats(owner_id, priority, complete, count) '
+    'SELECT coalesce(owner_id, 0), coalesce(priority, 0), coalesce(complete, 0), count(*) FROM todos GROUP BY 1, 2, 3',
+)
+
+
+def create_todo_stats_triggers(target, connection, **kw):
+    """
+    Listener do 'after_create' do metadata: roda depois de todo create_all, inclusive quando as tabelas já existiam.
+
+    Se os triggers ainda não existiam (banco criado antes da todo_stats), os contadores são recalculados a partir de todos.
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+
+    existed = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'todo_stats_ai'"
+    ).scalar() is not None
+    for ddl in TODO_STATS_TRIGGERS:
+        connection.exec_driver_sql(ddl)
+    if not existed:
+        for statement in TODO_STATS_BACKFILL:
+            connection.exec_driver_sql(statement)
+
+
+event.listen(Base.metadata, 'after_create', create_todo_stats_triggers)
+
+
+def summarize(rows):
+    # rows: (priority, complete, count) de um dono (ou de todos os donos somados).
+    total = completed = 0
+    by_priority = {}
+    for priority, complete, count in rows:
+        total += count
+        if complete:
+            completed += count
+        by_priority[priority] = by_priority.get(priority, 0) + count
+    return {
+        'total': total,
+        'completed': completed,
+        'completion_rate': round(completed / total, 4) if total else 0.0,
+        'by_priority': {priority: count for priority, count in sorted(by_priority.items()) if count},
+    }
+
+
+async def owner_stats(db, owner_id: int):
+    result = await db.execute(
+        select(TodoStats.priority, TodoStats.complete, TodoStats.count).where(TodoStats.owner_id == owner_id)
+    )
+    return summarize(result.all())
+
+
+async def all_stats_rows(db):
+    result = await db.execute(
+        select(TodoStats.owner_id, TodoStats.priority, TodoStats.complete, TodoStats.count)
+        .where(TodoStats.count > 0)
+        .order_by(TodoStats.owner_id)
+    )
+    return result.all()
+
+
+def summarize_all(rows):
+    # rows: (owner_id, priority, complete, count) ordenadas por owner_id, de um shard ou de vários juntos.
+    per_owner = {}
+    for owner_id, priority, complete, count in rows:
+        per_owner.setdefault(owner_id, []).append((priority, complete, count))
+
+    return {
+        **summarize((priority, complete, count) for _, priority, complete, count in rows),
+        'by_owner': [{'owner_id': owner_id, **summarize(owner_rows)} for owner_id, owner_rows in per_owner.items()],
+    }
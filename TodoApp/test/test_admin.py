@@ -1,10 +1,19 @@
+import json
+import tracemalloc
+from datetime import timedelta
+
 from fastapi import status
 
+from ..database import shard_id_start
+from ..export import stream_todos
+from ..schema import create_shard_schema
 from ..models import Todos
-from ..routers.admin import get_current_user, get_db
+from ..routers.admin import get_current_user, get_shard_read_sessionmakers, get_shard_sessionmakers
+from ..routers.auth import create_acess_token
 from .utils import *
 
-app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_shard_sessionmakers] = lambda: [TestingAsyncSessionLocal]
+app.dependency_overrides[get_shard_read_sessionmakers] = lambda: [TestingReadSessionLocal]
 app.dependency_overrides[get_current_user] = override_get_current_user
 
 def test_admin_read_all_authenticated(test_todo):
@@ -19,10 +28,47 @@ def test_admin_read_all_authenticated(test_todo):
         'owner_id': 1
     }]
 
+def test_admin_routes_accept_real_admin_token(test_todo, monkeypatch):
+    # Sem o override do get_current_user: as claims vêm de um JWT de verdade, como em produção.
+    overrides = {dependency: override for dependency, override in app.dependency_overrides.items() if dependency is not get_current_user}
+    monkeypatch.setattr(app, 'dependency_overrides', overrides)
+    admin_token = create_acess_token('matheusrocha', 1, 'admin', timedelta(minutes=20))
+    user_token = create_acess_token('otheruser', 2, 'user', timedelta(minutes=20))
+    
+    response = client.get('/admin/todo', headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [todo['id'] for todo in response.json()] == [1]
+    
+    response = client.get('/admin/todo', headers={'Authorization': f'Bearer {user_token}'})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_admin_read_all_paginated(test_todo):
+    db = TestingSessionLocal()
+    db.add_all([
+        Todos(title='Second todo', description='Owned by user 2', priority=2, complete=False, owner_id=2),
+        Todos(title='Third todo', description='Owned by user 3', priority=3, complete=True, owner_id=3),
+    ])
+    db.commit()
+    
+    response = client.get('/admin/todo?limit=2')
+    assert response.status_code == status.HTTP_200_OK
+    assert [todo['id'] for todo in response.json()] == [1, 2]
+    assert response.headers['X-Next-Cursor'] == '2'
+    
+    response = client.get('/admin/todo?limit=2&after=2')
+    assert response.status_code == status.HTTP_200_OK
+    assert [todo['title'] for todo in response.json()] == ['Third todo']
+    assert 'X-Next-Cursor' not in response.headers
+    
+    response = client.get('/admin/todo?after=3')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
 def test_admin_delete_todo(test_todo):
     response = client.delete('/admin/todo/1')
     
     assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert_max_queries(response, 1)
     
     db = TestingSessionLocal()
     model = db.query(Todos).filter(Todos.id == 1).first()
@@ -35,4 +81,109 @@ def test_admin_delete_todo_not_found(test_todo):
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.json() == {
         'detail': 'Todo not found'
-    }
\ No newline at end of file
+    }
+    
+def test_admin_stats(test_todo):
+    db = TestingSessionLocal()
+    db.add(Todos(title='Other user todo', description='Owned by user 2', priority=1, complete=True, owner_id=2))
+    db.commit()
+    
+    response = client.get('/admin/stats')
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        'total': 2, 'completed': 1, 'completion_rate': 0.5, 'by_priority': {'1': 1, '5': 1},
+        'by_owner': [
+            {'owner_id': 1, 'total': 1, 'completed': 0, 'completion_rate': 0.0, 'by_priority': {'5': 1}},
+            {'owner_id': 2, 'total': 1, 'completed': 1, 'completion_rate': 1.0, 'by_priority': {'1': 1}},
+        ]
+    }
+    
+    client.delete('/admin/todo/1')
+    assert client.get('/admin/stats').json()['by_owner'] == [
+        {'owner_id': 2, 'total': 1, 'completed': 1, 'completion_rate': 1.0, 'by_priority': {'1': 1}},
+    ]
+    
+def test_admin_routes_fan_out_across_shards(test_todo, tmp_path, monkeypatch):
+    # Um segundo shard com dois todos do usuário 2, ao lado do testdb.db (shard 0, com o todo 1 do usuário 1).
+    shard_path = tmp_path / 'testdb.shard1.db'
+    with create_engine(f'sqlite:///{shard_path}').begin() as connection:
+        create_shard_schema(connection, 1)
+        connection.execute(Todos.__table__.insert(), [
+            {'title': f'Shard todo {n}', 'description': 'Lives in shard 1', 'priority': 1, 'complete': n == 1, 'owner_id': 2}
+            for n in range(2)
+        ])
+    shard_engine = create_async_engine(f'sqlite+aiosqlite:///{shard_path}')
+    ShardSessionLocal = async_sessionmaker(bind=shard_engine, autoflush=False, expire_on_commit=False)
+    monkeypatch.setitem(app.dependency_overrides, get_shard_sessionmakers, lambda: [TestingAsyncSessionLocal, ShardSessionLocal])
+    monkeypatch.setitem(app.dependency_overrides, get_shard_read_sessionmakers, lambda: [TestingReadSessionLocal, ShardSessionLocal])
+    first_shard_id = shard_id_start(1) + 1
+    
+    response = client.get('/admin/todo?limit=2')
+    assert [todo['id'] for todo in response.json()] == [1, first_shard_id]
+    assert response.headers['X-Next-Cursor'] == str(first_shard_id)
+    
+    response = client.get(f'/admin/todo?limit=2&after={first_shard_id}')
+    assert [todo['id'] for todo in response.json()] == [first_shard_id + 1]
+    assert 'X-Next-Cursor' not in response.headers
+    
+    stats = client.get('/admin/stats').json()
+    assert (stats['total'], stats['completed']) == (3, 1)
+    assert [owner['owner_id'] for owner in stats['by_owner']] == [1, 2]
+    
+    lines = client.get('/admin/todo/export').text.splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [1, first_shard_id, first_shard_id + 1]
+    
+    assert client.delete(f'/admin/todo/{first_shard_id}').status_code == status.HTTP_204_NO_CONTENT
+    assert client.delete(f'/admin/todo/{first_shard_id}').status_code == status.HTTP_404_NOT_FOUND
+    assert [todo['id'] for todo in client.get('/admin/todo').json()] == [1, first_shard_id + 1]
+
+    
+def test_admin_export_ndjson(test_todo):
+    with client.stream('GET', '/admin/todo/export') as response:
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['content-type'] == 'application/x-ndjson'
+        lines = list(response.iter_lines())
+        
+    assert [json.loads(line) for line in lines] == [{
+        'id': 1, 'title': 'Learn to code', 'description': 'Need to learn everyday', 'priority': 5, 'complete': False, 'owner_id': 1
+    }]
+    
+def test_admin_export_csv(test_todo):
+    response = client.get('/admin/todo/export?format=csv')
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-disposition'] == 'attachment; filename="todos.csv"'
+    assert response.text.splitlines() == [
+        'id,title,description,priority,complete,owner_id',
+        '1,Learn to code,Need to learn everyday,5,False,1',
+    ]
+    
+@pytest.mark.asyncio
+async def test_admin_export_memory_does_not_grow_with_rows(test_todo):
+    # Consome o gerador da resposta direto: o TestClient guarda o corpo inteiro na memória e mascararia a medição.
+    async def export_peak():
+        exported = 0
+        tracemalloc.start()
+        try:
+            async for chunk in stream_todos([TestingAsyncSessionLocal], 'ndjson'):
+                exported += chunk.count(b'\n')
+            return exported, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            
+    def add_todos(count):
+        with engine.begin() as connection:
+            connection.execute(Todos.__table__.insert(), [
+                {'title': f'Export {n}', 'description': 'Export test', 'priority': 1, 'complete': False, 'owner_id': 1}
+                for n in range(count)
+            ])
+            
+    add_todos(5_000)
+    small_rows, small_peak = await export_peak()
+    add_todos(20_000)
+    large_rows, large_peak = await export_peak()
+    
+    assert (small_rows, large_rows) == (5_001, 25_001)
+    # 5x mais linhas, mas o pico de memória continua na casa de um lote.
+    assert large_peak < small_peak * 1.5
@@ -1,27 +1,69 @@
+import time
 from datetime import timedelta
 
 import pytest
 from fastapi import HTTPException, status
 from jose import jwt
+from sqlalchemy import select
 
-from ..routers.auth import (ALGORITHM, SECRET_KEY, authenticate_user,
-                            create_acess_token, get_current_user, get_db)
+from ..deps import get_db, get_read_db
+from ..hashing import verify_password
+from ..login_throttle import InMemoryTokenBuckets, LoginThrottle
+from ..routers import auth
+from ..routers.auth import (ALGORITHM, SECRET_KEY, authenticate_user, bcrypt_context,
+                            create_acess_token, get_current_user)
+from ..token_cache import TokenCache, token_cache
 from .utils import *
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
 
-def test_authenticate_user(test_user):
-    db = TestingSessionLocal()
+@pytest.mark.asyncio
+async def test_authenticate_user(test_user):
+    async with TestingAsyncSessionLocal() as db:
+        authenticated_user = await authenticate_user(test_user.username, 'teste1234', db)
+        assert authenticated_user is not None
+        assert authenticated_user.username == test_user.username
+        
+        non_existent_user = await authenticate_user('WrongUsername', 'teste1234', db)
+        assert non_existent_user is False
+        
+        wrong_password_user = await authenticate_user(test_user.username, 'wrongpassword', db)
+        assert wrong_password_user is False
+
+@pytest.mark.asyncio
+async def test_authenticate_user_rehashes_password_with_other_cost(test_user):
+    old_hash = bcrypt_context.handler().using(rounds=4).hash('teste1234')
+    with engine.connect() as connection:
+        connection.execute(text('UPDATE users SET hashed_password = :hash'), {'hash': old_hash})
+        connection.commit()
+    
+    async with TestingAsyncSessionLocal() as db:
+        assert await authenticate_user(test_user.username, 'wrongpassword', db) is False
+        assert (await db.scalar(select(Users.hashed_password))) == old_hash
+        
+        user = await authenticate_user(test_user.username, 'teste1234', db)
+        
+    assert user.hashed_password != old_hash
+    assert not bcrypt_context.needs_update(user.hashed_password)
+    with engine.connect() as connection:
+        assert connection.scalar(text('SELECT hashed_password FROM users')) == user.hashed_password
     
-    authenticated_user = authenticate_user(test_user.username, 'teste1234', db)
-    assert authenticated_user is not None
-    assert authenticated_user.username == test_user.username
+@pytest.mark.asyncio
+async def test_authenticate_user_releases_connection_before_bcrypt(test_user, monkeypatch):
+    checked_out = []
+    
+    async def recording_verify_password(password, hashed_password):
+        checked_out.append((read_engine.sync_engine.pool.checkedout(), async_engine.sync_engine.pool.checkedout()))
+        return await verify_password(password, hashed_password)
     
-    non_existent_user = authenticate_user('WrongUsername', 'teste1234', db)
-    assert non_existent_user is False
+    monkeypatch.setattr(auth, 'verify_password', recording_verify_password)
     
-    wrong_password_user = authenticate_user(test_user.username, 'wrongpassword', db)
-    assert wrong_password_user is False
+    async with TestingReadSessionLocal() as db, TestingAsyncSessionLocal() as write_db:
+        user = await authenticate_user(test_user.username, 'teste1234', db, write_db)
+        
+    assert user.username == test_user.username
+    assert checked_out == [(0, 0)]
     
 def test_create_acess_token():
     username = 'testeuser'
@@ -66,4 +108,85 @@ async def test_get_current_user_missing_payload():
     assert excinfo.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert excinfo.value.detail == 'Could not validate user'
     
-              
\ No newline at end of file
+@pytest.mark.asyncio
+async def test_get_current_user_uses_token_cache():
+    token_cache.clear()
+    token = create_acess_token('cacheduser', 2, 'user', timedelta(minutes=20))
+    
+    first = await get_current_user(token=token)
+    second = await get_current_user(token=token)
+    
+    assert first == second == {'username': 'cacheduser', 'id': 2, 'user_role': 'user'}
+    assert token_cache.stats() == {'size': 1, 'hits': 1, 'misses': 1}
+    
+def test_token_cache_expires_at_token_exp():
+    cache = TokenCache()
+    cache.set('expired', {'username': 'testuser'}, exp=time.time() - 1)
+    cache.set('valid', {'username': 'testuser'}, exp=time.time() + 60)
+    
+    assert cache.get('expired') is None
+    assert cache.get('valid') == {'username': 'testuser'}
+    
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(max_entries=2)
+    cache.set('a', {'id': 1})
+    cache.set('b', {'id': 2})
+    cache.get('a')
+    cache.set('c', {'id': 3})
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == {'id': 1}
+    assert cache.get('c') == {'id': 3}
+
+@pytest.fixture
+def throttle(monkeypatch):
+    login_throttle = LoginThrottle(InMemoryTokenBuckets(), enabled=True, user_burst=2, user_per_minute=1, ip_burst=3, ip_per_minute=1)
+    monkeypatch.setattr(auth, 'login_throttle', login_throttle)
+    
+    calls = []
+    original = auth.authenticate_user
+    
+    async def counting_authenticate_user(username, password, db, write_db=None):
+        calls.append(username)
+        return await original(username, password, db, write_db)
+    
+    monkeypatch.setattr(auth, 'authenticate_user', counting_authenticate_user)
+    return calls
+    
+def test_login_throttled_per_username_before_bcrypt(throttle, test_user):
+    form = {'username': test_user.username, 'password': 'wrongpassword'}
+    
+    statuses = [client.post('/auth/token', data=form).status_code for _ in range(3)]
+    
+    assert statuses == [status.HTTP_401_UNAUTHORIZED, status.HTTP_401_UNAUTHORIZED, status.HTTP_429_TOO_MANY_REQUESTS]
+    assert len(throttle) == 2
+    
+    response = client.post('/auth/token', data={'username': test_user.username.upper(), 'password': 'teste1234'})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {'detail': 'Too many login attempts'}
+    assert int(response.headers['Retry-After']) > 0
+    assert len(throttle) == 2
+    
+def test_login_throttled_per_ip(throttle, test_user):
+    statuses = [
+        client.post('/auth/token', data={'username': f'unknown{i}', 'password': 'wrongpassword'}).status_code
+        for i in range(4)
+    ]
+    
+    assert statuses == [status.HTTP_401_UNAUTHORIZED] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS]
+    assert throttle == ['unknown0', 'unknown1', 'unknown2']
+    
+@pytest.mark.asyncio
+async def test_token_buckets_refill_over_time():
+    now = [0.0]
+    buckets = InMemoryTokenBuckets(clock=lambda: now[0])
+    
+    assert await buckets.take('user:a', 2, 60) == 0
+    assert await buckets.take('user:a', 2, 60) == 0
+    assert await buckets.take('user:a', 2, 60) == pytest.approx(1.0)
+    assert await buckets.take('user:b', 2, 60) == 0
+    
+    now[0] = 0.5
+    assert await buckets.take('user:a', 2, 60) == pytest.approx(0.5)
+    now[0] = 1.0
+    assert await buckets.take('user:a', 2, 60) == 0
@@ -0,0 +1,127 @@
+import logging
+
+from fastapi import status
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from .. import query_stats
+from ..database import SQLITE_PRAGMAS, ShardRing, read_only_url, shard_id_start, shard_url
+from ..routers import todos
+from ..schema import create_schema, create_shard_schema
+from ..stats import create_todo_stats_triggers
+from .utils import *
+
+
+def test_sqlite_pragmas_applied_on_connect():
+    with engine.connect() as connection:
+        assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert connection.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert connection.execute(text('PRAGMA busy_timeout')).scalar() == int(SQLITE_PRAGMAS['busy_timeout'])
+        assert connection.execute(text('PRAGMA temp_store')).scalar() == 2  # MEMORY
+        
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied_on_async_connect():
+    async with async_engine.connect() as connection:
+        result = await connection.execute(text('PRAGMA journal_mode'))
+        assert result.scalar() == 'wal'
+    
+def test_read_only_url():
+    assert read_only_url('sqlite+aiosqlite:///./todosapp.db') == 'sqlite+aiosqlite:///file:./todosapp.db?mode=ro&uri=true'
+    assert read_only_url('sqlite+aiosqlite://') == 'sqlite+aiosqlite://'
+    assert read_only_url('postgresql+asyncpg://user:pw@localhost/todos') == 'postgresql+asyncpg://user:pw@localhost/todos'
+    
+@pytest.mark.asyncio
+async def test_read_engine_rejects_writes(test_todo):
+    async with read_engine.connect() as connection:
+        assert (await connection.execute(text('PRAGMA query_only'))).scalar() == 1
+        assert (await connection.execute(text('SELECT count(*) FROM todos'))).scalar() == 1
+        
+        with pytest.raises(OperationalError, match='readonly database'):
+            await connection.execute(text("UPDATE todos SET title = 'changed'"))
+    
+def test_server_timing_header_counts_queries(test_todo):
+    app.dependency_overrides[todos.get_db] = override_get_db
+    app.dependency_overrides[todos.get_read_db] = override_get_read_db
+    app.dependency_overrides[todos.get_current_user] = override_get_current_user
+    
+    response = client.get('/todos/todo/1')
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert query_count(response) == 1
+    
+def test_slow_query_logged_with_query_plan(monkeypatch, caplog):
+    monkeypatch.setattr(query_stats, 'SLOW_QUERY_MS', 0)
+    
+    with caplog.at_level(logging.WARNING, logger='todoapp.sql'):
+        with engine.connect() as connection:
+            connection.execute(text('SELECT * FROM todos WHERE owner_id = :owner_id'), {'owner_id': 1})
+            
+    assert 'Slow query' in caplog.text
+    assert 'ix_todos_owner_id' in caplog.text
+    
+def test_create_schema_defers_to_alembic():
+    memory_engine = create_engine('sqlite://')
+    with memory_engine.begin() as connection:
+        connection.execute(text('CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)'))
+        
+        assert create_schema(connection) is False
+        assert not inspect(connection).has_table('todos')
+        
+def test_create_schema_creates_tables():
+    memory_engine = create_engine('sqlite://')
+    with memory_engine.begin() as connection:
+        assert create_schema(connection) is True
+        assert inspect(connection).has_table('todos')
+        assert create_schema(connection) is True  # idempotente
+        
+def test_todo_stats_backfilled_for_existing_todos():
+    memory_engine = create_engine('sqlite://')
+    with memory_engine.begin() as connection:
+        create_schema(connection)
+        connection.execute(text('DROP TRIGGER todo_stats_ai'))
+        connection.execute(text(
+            "INSERT INTO todos (title, description, priority, complete, owner_id) "
+            "VALUES ('a', 'a', 1, 1, 7), ('b', 'b', 1, 0, 7), ('c', 'c', 3, 0, 8)"
+        ))
+        
+        create_todo_stats_triggers(None, connection)
+        
+        rows = connection.execute(text('SELECT owner_id, priority, complete, count FROM todo_stats ORDER BY 1, 2, 3')).all()
+        assert rows == [(7, 1, 0, 1), (7, 1, 1, 1), (8, 3, 0, 1)]
+    
+def test_shard_ring_spreads_owners_and_moves_few_on_resize():
+    owners = range(1, 10_001)
+    four = {owner: ShardRing(4).shard_for(owner) for owner in owners}
+    five = {owner: ShardRing(5).shard_for(owner) for owner in owners}
+    
+    assert all(0.15 < list(four.values()).count(shard) / len(owners) < 0.35 for shard in range(4))
+    assert ShardRing(1).shard_for(123) == 0
+    
+    # Com um shard a mais, só mudam os donos que vão para o shard novo (cerca de 1/5), e nenhum troca entre os antigos.
+    moved = [owner for owner in owners if four[owner] != five[owner]]
+    assert {five[owner] for owner in moved} == {4}
+    assert 0.1 < len(moved) / len(owners) < 0.3
+    
+def test_shard_url():
+    assert shard_url('sqlite+aiosqlite:///./todosapp.db', 0) == 'sqlite+aiosqlite:///./todosapp.db'
+    assert shard_url('sqlite+aiosqlite:///./todosapp.db', 2) == 'sqlite+aiosqlite:///./todosapp.shard2.db'
+    with pytest.raises(ValueError):
+        shard_url('sqlite+aiosqlite://', 1)
+    
+def test_create_shard_schema_allocates_ids_in_shard_range(tmp_path):
+    shard_engine = create_engine(f'sqlite:///{tmp_path}/todosapp.shard3.db')
+    with shard_engine.begin() as connection:
+        create_shard_schema(connection, 3)
+        create_shard_schema(connection, 3)  # rodar de novo não mexe na sequência
+        
+        assert not inspect(connection).has_table('users')
+        connection.execute(Todos.__table__.insert(), [
+            {'title': 'Sharded', 'description': 'Lives in shard 3', 'priority': 2, 'complete': False, 'owner_id': 7}
+        ])
+        assert connection.execute(text('SELECT id FROM todos')).scalar() == shard_id_start(3) + 1
+        assert connection.execute(text('SELECT count FROM todo_stats WHERE owner_id = 7')).scalar() == 1
+        assert connection.execute(text("SELECT rowid FROM todos_fts WHERE todos_fts MATCH 'sharded'")).scalar() == shard_id_start(3) + 1
+    shard_engine.dispose()
+    
+    # A cópia da tabela com AUTOINCREMENT é só dos shards; a todos do banco principal continua igual.
+    assert Todos.__table__.dialect_options['sqlite']['autoincrement'] is False
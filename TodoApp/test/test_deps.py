@@ -0,0 +1,82 @@
+from fastapi import Depends, FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from .. import database
+from ..deps import db_dependency
+from ..routers.auth import get_current_user
+from .utils import *
+
+BAD_TOKEN = {'Authorization': 'Bearer not-a-jwt'}
+
+
+@pytest.fixture
+def real_deps(monkeypatch):
+    # Sem os overrides dos testes: as dependências de verdade (deps.py e o get_db do router de todos),
+    # ligadas aos engines de teste no lugar dos do database.py.
+    monkeypatch.setattr(app, 'dependency_overrides', {})
+    monkeypatch.setattr(database, 'AsyncSessionLocal', TestingAsyncSessionLocal, raising=False)
+    monkeypatch.setattr(database, 'ReadSessionLocal', TestingReadSessionLocal, raising=False)
+    monkeypatch.setattr(
+        database, 'todo_sessionmaker', lambda owner_id, read=False: TestingReadSessionLocal if read else TestingAsyncSessionLocal
+    )
+
+
+@pytest.fixture
+def checkouts():
+    counter = {'checkouts': 0}
+
+    def count(dbapi_connection, connection_record, connection_proxy):
+        counter['checkouts'] += 1
+
+    engines = (async_engine.sync_engine, read_engine.sync_engine)
+    for testing_engine in engines:
+        event.listen(testing_engine, 'checkout', count)
+    yield counter
+    for testing_engine in engines:
+        event.remove(testing_engine, 'checkout', count)
+
+
+def test_rejected_requests_check_out_no_connections(real_deps, checkouts, test_todo):
+    responses = [
+        client.get('/todos/'),
+        client.get('/todos/todo/1', headers=BAD_TOKEN),
+        client.post('/todos/todo', headers=BAD_TOKEN, json={'title': 'New todo', 'description': 'Rejected', 'priority': 1, 'complete': False}),
+        client.get('/users/', headers=BAD_TOKEN),
+        client.put('/users/password', headers=BAD_TOKEN, json={'password': 'testpassword', 'new_password': 'newpassword'}),
+        client.get('/admin/todo', headers=BAD_TOKEN),
+        client.delete('/admin/todo/1', headers=BAD_TOKEN),
+    ]
+
+    assert [response.status_code for response in responses] == [status.HTTP_401_UNAUTHORIZED] * len(responses)
+    assert checkouts['checkouts'] == 0
+
+
+def test_connection_returned_before_response(real_deps, checkouts, test_todo):
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    response = client.get('/todos/todo/1')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert checkouts['checkouts'] == 1
+    assert async_engine.sync_engine.pool.checkedout() == 0
+    assert read_engine.sync_engine.pool.checkedout() == 0
+
+
+def test_dependencies_of_one_request_share_the_session(real_deps, checkouts):
+    sessions_app = FastAPI()
+
+    async def first(db: db_dependency):
+        return db
+
+    async def second(db: db_dependency):
+        return db
+
+    @sessions_app.get('/')
+    async def route(db: db_dependency, a=Depends(first), b=Depends(second)):
+        return {'shared': db is a is b}
+
+    with TestClient(sessions_app) as sessions_client:
+        assert sessions_client.get('/').json() == {'shared': True}
+    # Ninguém fez query: a sessão foi criada, mas nenhuma conexão saiu do pool.
+    assert checkouts['checkouts'] == 0
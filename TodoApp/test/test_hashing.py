@@ -0,0 +1,43 @@
+import pytest
+from fastapi import HTTPException, status
+
+from .. import hashing
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_password():
+    hashed = await hashing.hash_password('teste1234')
+    
+    assert hashed != 'teste1234'
+    assert await hashing.verify_password('teste1234', hashed) is True
+    assert await hashing.verify_password('senha_errada', hashed) is False
+    
+@pytest.mark.asyncio
+async def test_hash_password_rejects_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(hashing, '_pending', hashing.HASH_MAX_PENDING)
+    
+    with pytest.raises(HTTPException) as excinfo:
+        await hashing.hash_password('teste1234')
+        
+    assert excinfo.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert excinfo.value.headers == {'Retry-After': '1'}
+    
+def test_needs_rehash_when_rounds_differ():
+    other_cost = hashing.bcrypt_context.handler().using(rounds=4).hash('teste1234')
+    
+    assert hashing.needs_rehash(other_cost) is True
+    assert hashing.needs_rehash(hashing.bcrypt_context.hash('teste1234')) is False
+    
+def test_calibrate_rounds_picks_highest_within_target():
+    measured = []
+    
+    def fake_measure(rounds, samples):
+        measured.append(rounds)
+        return 2 ** rounds / 10_000  # ~0.1 ms no round 0, dobrando a cada round
+    
+    rounds, timings = hashing.calibrate_rounds(250, measure=fake_measure)
+    
+    assert rounds == 11
+    assert timings[11] == 204.8
+    assert measured == [4, 5, 6, 7, 8, 9, 10, 11, 12]
+    assert hashing.calibrate_rounds(0.1, measure=fake_measure)[0] == 4
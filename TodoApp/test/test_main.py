@@ -1,7 +1,16 @@
+import os
+import subprocess
+import sys
+
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from .. import main
+from ..database import get_async_engine
 from ..main import app
+from ..metrics import Metrics
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 """
     O TestClient é uma ferramenta do FastAPI (em cima do Starlette) que permite simular chamadas HTTP ao seu app FastAPI sem precisar subir um servidor de verdade.
@@ -18,3 +27,74 @@ def test_return_health_check():
     response = client.get('/healthy')
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {'status': 'Healthy'}
+    
+def test_metrics_exposes_route_latency_and_status():
+    get_async_engine()  # o pool passa a ser acompanhado quando o engine é criado
+    client.get('/healthy')
+    client.get('/rota-que-nao-existe')
+    
+    response = client.get('/metrics')
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'todoapp_http_requests_total{method="GET",route="/healthy",status="200"}' in response.text
+    assert 'todoapp_http_requests_total{method="GET",route="<unmatched>",status="404"}' in response.text
+    assert 'todoapp_http_request_duration_seconds_count{method="GET",route="/healthy"}' in response.text
+    assert 'todoapp_db_pool_checked_out{pool="async"}' in response.text
+    
+def test_metrics_histogram_buckets_are_cumulative():
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.observe('GET', '/todos/', 200, 0.05)
+    registry.observe('GET', '/todos/', 200, 0.5)
+    registry.observe('GET', '/todos/', 200, 5.0)
+    
+    text = registry.render()
+    
+    assert 'todoapp_http_request_duration_seconds_bucket{method="GET",route="/todos/",le="0.1"} 1' in text
+    assert 'todoapp_http_request_duration_seconds_bucket{method="GET",route="/todos/",le="1.0"} 2' in text
+    assert 'todoapp_http_request_duration_seconds_bucket{method="GET",route="/todos/",le="+Inf"} 3' in text
+    assert 'todoapp_http_requests_total{method="GET",route="/todos/",status="200"} 3' in text
+    
+def run_python(code, cwd):
+    # Processo novo, para medir o import do app do zero (sem os módulos que o pytest já carregou).
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': APP_ROOT}
+    )
+    return result.stdout
+
+def test_import_main_has_no_side_effects(tmp_path):
+    # Importar o app não pode criar engine, carregar o driver do banco nem criar o todosapp.db.
+    output = run_python(
+        'import sys; import TodoApp.main; from TodoApp import database; '
+        'print("engine" in vars(database), "async_engine" in vars(database), "aiosqlite" in sys.modules)',
+        tmp_path
+    )
+    
+    assert output.split() == ['False', 'False', 'False']
+    assert list(tmp_path.iterdir()) == []
+    
+def test_lifespan_creates_schema(tmp_path):
+    output = run_python(
+        'from fastapi.testclient import TestClient; from TodoApp.main import app\n'
+        'with TestClient(app) as client: print(client.post("/auth/token", data={"username": "x", "password": "y"}).status_code)',
+        tmp_path
+    )
+    
+    assert output.strip() == '401'
+    assert (tmp_path / 'todosapp.db').exists()
+    
+def test_lifespan_shuts_down_hash_pool_and_engines(monkeypatch):
+    calls = []
+    
+    async def dispose_engines():
+        calls.append('engines')
+    
+    monkeypatch.setattr(main, 'CREATE_SCHEMA_ON_STARTUP', False)
+    monkeypatch.setattr(main, 'shutdown_executor', lambda: calls.append('hash pool'))
+    monkeypatch.setattr(main, 'dispose_engines', dispose_engines)
+    
+    with TestClient(app):
+        assert calls == []
+        
+    assert calls == ['hash pool', 'engines']
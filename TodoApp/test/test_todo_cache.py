@@ -0,0 +1,52 @@
+from ..todo_cache import TodoListCache
+
+
+def test_put_discarded_after_concurrent_invalidation():
+    cache = TodoListCache()
+    generation = cache.generation(1)
+    cache.invalidate(1)
+    
+    cache.put(1, (0, 100), b'[]', None, generation)
+    
+    assert cache.get(1, (0, 100)) is None
+    
+def test_evicts_least_recently_used_pages_over_memory_cap():
+    cache = TodoListCache(max_bytes=10)
+    cache.put(1, (0, 100), b'12345', None, cache.generation(1))
+    cache.put(2, (0, 100), b'12345', None, cache.generation(2))
+    cache.get(1, (0, 100))
+    cache.put(3, (0, 100), b'12345', None, cache.generation(3))
+    
+    assert cache.get(2, (0, 100)) is None
+    assert cache.get(1, (0, 100)).body == b'12345'
+    assert cache.stats()['bytes'] == 10
+    
+def test_invalidate_drops_every_page_of_owner():
+    cache = TodoListCache()
+    cache.put(1, (0, 1), b'[1]', 1, cache.generation(1))
+    cache.put(1, (1, 1), b'[2]', None, cache.generation(1))
+    cache.put(2, (0, 1), b'[3]', None, cache.generation(2))
+    
+    cache.invalidate(1)
+    
+    assert cache.get(1, (0, 1)) is None
+    assert cache.get(1, (1, 1)) is None
+    assert cache.get(2, (0, 1)).body == b'[3]'
+    
+def test_invalidations_stay_bounded():
+    cache = TodoListCache(max_invalidations=3)
+    stale_generation = cache.generation(1)
+    
+    for owner_id in range(1, 101):
+        cache.invalidate(owner_id)
+    
+    assert cache.stats()['invalidations'] == 3
+    # A invalidação do usuário 1 já foi esquecida, mas uma leitura que começou antes dela continua sem ir para o cache.
+    cache.put(1, (0, 100), b'[]', None, stale_generation)
+    assert cache.get(1, (0, 100)) is None
+    
+    cache.put(1, (0, 100), b'[]', None, cache.generation(1))
+    assert cache.get(1, (0, 100)).body == b'[]'
+    
+    cache.clear()
+    assert cache.stats()['invalidations'] == 0
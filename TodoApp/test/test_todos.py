@@ -3,10 +3,11 @@ from fastapi import status
 
 from ..main import app
 from ..models import Todos
-from ..routers.todos import get_current_user, get_db
+from ..routers.todos import BULK_MAX_ITEMS, get_current_user, get_db, get_read_db
 from .utils import *
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
 app.dependency_overrides[get_current_user] = override_get_current_user
 
 """
@@ -31,6 +32,54 @@ app.dependency_overrides[get_current_user] = override_get_current_user
 """
 
 
+def test_read_all_paginated(test_todo):
+    client.post('/todos/todo', json={
+        'title': 'Second todo',
+        'description': 'Second page',
+        'priority': 3,
+        'complete': False
+    })
+    
+    response = client.get('/todos/?limit=1')
+    assert response.status_code == status.HTTP_200_OK
+    assert [todo['id'] for todo in response.json()] == [1]
+    assert response.headers['X-Next-Cursor'] == '1'
+    
+    response = client.get('/todos/?limit=1&after=1')
+    assert response.status_code == status.HTTP_200_OK
+    assert [todo['id'] for todo in response.json()] == [2]
+    assert 'X-Next-Cursor' not in response.headers
+    
+def test_read_all_rejects_limit_above_maximum(test_todo):
+    response = client.get('/todos/?limit=100000')
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+def test_read_all_returns_not_modified_for_matching_etag(test_todo):
+    response = client.get('/todos/')
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers['ETag']
+    
+    response = client.get('/todos/', headers={'If-None-Match': etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert query_count(response) == 0
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+    
+def test_read_all_cache_invalidated_on_write(test_todo):
+    etag = client.get('/todos/').headers['ETag']
+    
+    client.put('/todos/todo/1', json={
+        'title': 'Changed while cached',
+        'description': 'Need to learn everyday',
+        'priority': 5,
+        'complete': True
+    })
+    
+    response = client.get('/todos/', headers={'If-None-Match': etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['ETag'] != etag
+    assert response.json()[0]['title'] == 'Changed while cached'
+
 def test_read_one_authenticated(test_todo):
     response = client.get("/todos/todo/1")
     assert response.status_code == status.HTTP_200_OK
@@ -79,6 +128,7 @@ def test_update_todo(test_todo):
     
     response = client.put('/todos/todo/1', json=request_data)
     assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert_max_queries(response, 1)
     
     db = TestingSessionLocal()
     model = db.query(Todos).filter(Todos.id == 1).first()
@@ -113,5 +163,114 @@ def test_delete_todo_not_found():
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.json() == {'detail': 'Todo not found'}
     
+def test_create_todos_bulk(test_todo):
+    request_data = [
+        {'title': 'Bulk one', 'description': 'First bulk todo', 'priority': 1, 'complete': False},
+        {'title': 'Bulk two', 'description': 'Second bulk todo', 'priority': 2, 'complete': True},
+    ]
+    
+    response = client.post('/todos/bulk', json=request_data)
+    
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == [
+        {'id': 2, 'status_code': 201},
+        {'id': 3, 'status_code': 201},
+    ]
+    
+    db = TestingSessionLocal()
+    model = db.query(Todos).filter(Todos.id == 3).first()
+    assert model.title == 'Bulk two'
+    assert model.owner_id == 1
+    
+def test_create_todos_bulk_rejects_oversized_batch():
+    request_data = [
+        {'title': 'Bulk todo', 'description': 'Too many todos', 'priority': 1, 'complete': False}
+    ] * (BULK_MAX_ITEMS + 1)
+    
+    response = client.post('/todos/bulk', json=request_data)
+    
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+def test_update_todos_bulk(test_todo):
+    response = client.put('/todos/bulk', json=[
+        {'id': 1, 'title': 'Updated in bulk', 'description': 'Need to learn everyday', 'priority': 4, 'complete': True},
+        {'id': 999, 'title': 'Missing todo', 'description': 'Does not exist', 'priority': 4, 'complete': True},
+    ])
     
-    
\ No newline at end of file
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {'id': 1, 'status_code': 204},
+        {'id': 999, 'status_code': 404},
+    ]
+    
+    db = TestingSessionLocal()
+    model = db.query(Todos).filter(Todos.id == 1).first()
+    assert model.title == 'Updated in bulk'
+    assert model.complete is True
+    
+def test_delete_todos_bulk(test_todo):
+    response = client.request('DELETE', '/todos/bulk', json=[1, 999])
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {'id': 1, 'status_code': 204},
+        {'id': 999, 'status_code': 404},
+    ]
+    
+    db = TestingSessionLocal()
+    assert db.query(Todos).filter(Todos.id == 1).first() is None
+    
+def test_search_todos_ranked_and_scoped_by_owner(test_todo):
+    db = TestingSessionLocal()
+    db.add_all([
+        Todos(title='Buy groceries', description='Milk and bread', priority=1, complete=False, owner_id=1),
+        Todos(title='Call mom', description='Ask about the groceries list', priority=2, complete=False, owner_id=1),
+        Todos(title='Buy groceries', description='Someone else todo', priority=1, complete=False, owner_id=2),
+    ])
+    db.commit()
+    
+    response = client.get('/todos/search', params={'q': 'groceries'})
+    
+    assert response.status_code == status.HTTP_200_OK
+    # O título pesa mais que a descrição no ranking; o todo do usuário 2 não aparece.
+    assert [(todo['title'], todo['owner_id']) for todo in response.json()] == [('Buy groceries', 1), ('Call mom', 1)]
+    
+    response = client.get('/todos/search', params={'q': 'grocer* milk', 'limit': 1, 'offset': 0})
+    assert [todo['title'] for todo in response.json()] == ['Buy groceries']
+    
+    response = client.get('/todos/search', params={'q': 'groceries', 'limit': 1, 'offset': 1})
+    assert [todo['title'] for todo in response.json()] == ['Call mom']
+    
+def test_search_todos_follows_updates_and_deletes(test_todo):
+    client.put('/todos/todo/1', json={
+        'title': 'Learn FastAPI', 'description': 'Search with FTS5', 'priority': 5, 'complete': False
+    })
+    
+    assert client.get('/todos/search', params={'q': 'code'}).json() == []
+    assert [todo['id'] for todo in client.get('/todos/search', params={'q': 'fts5'}).json()] == [1]
+    
+    client.delete('/todos/todo/1')
+    assert client.get('/todos/search', params={'q': 'fts5'}).json() == []
+    
+def test_search_todos_ignores_query_syntax(test_todo):
+    for q in ['"unbalanced', 'code AND OR', 'owner_id:2', '*', 'NEAR(code']:
+        response = client.get('/todos/search', params={'q': q})
+        assert response.status_code == status.HTTP_200_OK
+        
+    assert [todo['id'] for todo in client.get('/todos/search', params={'q': 'learn CODE'}).json()] == [1]
+    
+def test_read_stats_follows_every_write(test_todo):
+    client.post('/todos/bulk', json=[
+        {'title': 'Bulk one', 'description': 'First of the batch', 'priority': 2, 'complete': True},
+        {'title': 'Bulk two', 'description': 'Second of the batch', 'priority': 2, 'complete': False},
+    ])
+    client.put('/todos/todo/1', json={
+        'title': 'Learn to code', 'description': 'Need to learn everyday', 'priority': 5, 'complete': True
+    })
+    client.delete('/todos/todo/3')
+    
+    response = client.get('/todos/stats')
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert_max_queries(response, 1)
+    assert response.json() == {'total': 2, 'completed': 2, 'completion_rate': 1.0, 'by_priority': {'2': 1, '5': 1}}
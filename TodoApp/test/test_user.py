@@ -1,9 +1,11 @@
 from fastapi import status
 
-from ..routers.users import get_current_user, get_db
+from ..deps import get_db, get_read_db
+from ..routers.users import get_current_user
 from .utils import *
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
 app.dependency_overrides[get_current_user] = override_get_current_user
 
 def test_return_user(test_user):
@@ -16,6 +18,13 @@ def test_return_user(test_user):
     assert response.json()['last_name'] == 'Rocha'
     assert response.json()['role'] == 'admin'
     assert response.json()['phone_number'] == '(11) 95604-2056'
+    assert 'hashed_password' not in response.json()
+    
+def test_return_user_not_found():
+    response = client.get('/users')
+    
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {'detail': 'User not found'}
     
 def test_change_password_sucess(test_user):
     response = client.put('/users/password', json={
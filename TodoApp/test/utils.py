@@ -1,15 +1,21 @@
+import re
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from ..database import Base
+from ..database import READ_SQLITE_PRAGMAS, Base, apply_sqlite_pragmas, read_only_url
 from ..main import app
 from ..models import Todos, Users
+from ..query_stats import install_query_hooks
 from ..routers.auth import bcrypt_context
+from ..todo_cache import todo_list_cache
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./testdb.db"
+SQLALCHEMY_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./testdb.db"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -19,20 +25,46 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL)
+
+apply_sqlite_pragmas(engine)
+apply_sqlite_pragmas(async_engine.sync_engine)
+install_query_hooks(engine)
+install_query_hooks(async_engine.sync_engine)
+
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# O mesmo testdb.db aberto como somente leitura, como o database.ReadSessionLocal das rotas GET.
+read_engine = create_async_engine(read_only_url(SQLALCHEMY_ASYNC_DATABASE_URL))
+apply_sqlite_pragmas(read_engine.sync_engine, READ_SQLITE_PRAGMAS)
+install_query_hooks(read_engine.sync_engine)
+
+TestingReadSessionLocal = async_sessionmaker(bind=read_engine, autoflush=False, expire_on_commit=False)
+
 Base.metadata.create_all(bind=engine)
 
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+async def override_get_read_db():
+    async with TestingReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
         
 def override_get_current_user():
-    return {'username': 'matheusrocha', 'id': 1, 'role': 'admin'}
+    return {'username': 'matheusrocha', 'id': 1, 'user_role': 'admin'}
 
 client = TestClient(app)
 
+def query_count(response):
+    # Lê o número de queries do header Server-Timing gravado pelo QueryStatsMiddleware.
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers['server-timing'])
+    return int(match.group(1))
+
+def assert_max_queries(response, max_queries):
+    count = query_count(response)
+    assert count <= max_queries, f'{count} queries executed, expected at most {max_queries}'
+
 @pytest.fixture
 def test_todo():
     todo = Todos(
@@ -50,6 +82,7 @@ def test_todo():
     with engine.connect() as connection:
         connection.execute(text('DELETE from todos;'))
         connection.commit()
+    todo_list_cache.clear()
         
 
 @pytest.fixture
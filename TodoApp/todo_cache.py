@@ -0,0 +1,142 @@
+"""
+Cache, por usuário, da listagem de todos já serializada em JSON.
+
+Os clientes fazem polling do 'GET /todos/' a cada poucos segundos e, na maioria das vezes, nada mudou.
+Aqui guardamos o corpo da resposta (bytes) e o ETag de cada página, de modo que:
+
+    - um polling repetido devolve os bytes prontos sem ir ao banco nem serializar de novo;
+    - se o cliente mandar 'If-None-Match' com o ETag atual, a resposta é um 304 sem corpo.
+
+Toda escrita nos todos de um usuário (create/update/delete, bulk e o delete do admin) chama invalidate(owner_id).
+
+O cache é por processo: com vários workers do uvicorn, um worker não fica sabendo das escritas feitas em outro.
+Por isso cada entrada também expira depois de TODOAPP_TODO_CACHE_TTL segundos, o que limita quanto tempo
+uma listagem desatualizada pode ser servida.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import NamedTuple, Optional
+
+TODO_CACHE_MAX_BYTES = int(os.getenv('TODOAPP_TODO_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+TODO_CACHE_TTL = float(os.getenv('TODOAPP_TODO_CACHE_TTL', 30))
+
+# Quantas invalidações recentes (uma por usuário) ficam guardadas para descartar os put() de leituras que começaram antes delas.
+TODO_CACHE_MAX_INVALIDATIONS = int(os.getenv('TODOAPP_TODO_CACHE_MAX_INVALIDATIONS', 4096))
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    etag: str
+    next_cursor: Optional[int]
+    expires_at: float
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+class TodoListCache:
+    def __init__(self, max_bytes: int = TODO_CACHE_MAX_BYTES, ttl: float = TODO_CACHE_TTL,
+                 max_invalidations: int = TODO_CACHE_MAX_INVALIDATIONS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_invalidations = max_invalidations
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_owner = defaultdict(set)
+        # Contador global de invalidações, o 'carimbo' de quando cada usuário foi invalidado pela última vez
+        # (só os mais recentes, em ordem de carimbo) e o piso: um put() com geração abaixo dele é sempre descartado.
+        self._stamp = 0
+        self._invalidated_at = OrderedDict()
+        self._floor = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def generation(self, owner_id) -> int:
+        # Lido antes da consulta ao banco; se uma escrita invalidar o usuário no meio do caminho, o put() é descartado.
+        # É o carimbo global (e não um contador por usuário), então ler não cria nada e dispensa o lock.
+        return self._stamp
+
+    def get(self, owner_id, key) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._entries.get((owner_id, key))
+            if page is None or page.expires_at <= time.monotonic():
+                if page is not None:
+                    self._remove((owner_id, key))
+                self.misses += 1
+                return None
+            self._entries.move_to_end((owner_id, key))
+            self.hits += 1
+            return page
+
+    def put(self, owner_id, key, body: bytes, next_cursor, generation: int) -> CachedPage:
+        page = CachedPage(body, make_etag(body), next_cursor, time.monotonic() + self.ttl)
+        if len(body) > self.max_bytes:
+            return page
+
+        with self._lock:
+            if generation < self._floor or self._invalidated_at.get(owner_id, 0) > generation:
+                return page
+            self._remove((owner_id, key))
+            self._entries[(owner_id, key)] = page
+            self._keys_by_owner[owner_id].add(key)
+            self._bytes += len(body)
+            # LRU limitado por memória: descarta as páginas usadas há mais tempo até caber no limite.
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return page
+
+    def invalidate(self, owner_id):
+        with self._lock:
+            self._stamp += 1
+            self._invalidated_at.pop(owner_id, None)
+            self._invalidated_at[owner_id] = self._stamp
+            # Limita a memória: esquece as invalidações mais antigas e sobe o piso até elas, o que descarta
+            # (em vez de gravar uma página desatualizada) os put() de leituras que começaram antes.
+            while len(self._invalidated_at) > self.max_invalidations:
+                _, self._floor = self._invalidated_at.popitem(last=False)
+            for key in list(self._keys_by_owner.pop(owner_id, ())):
+                self._remove((owner_id, key))
+
+    def clear(self):
+        with self._lock:
+            self._stamp += 1
+            self._floor = self._stamp
+            self._invalidated_at.clear()
+            self._entries.clear()
+            self._keys_by_owner.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses,
+            'invalidations': len(self._invalidated_at),
+        }
+
+    def _remove(self, entry_key):
+        page = self._entries.pop(entry_key, None)
+        if page is not None:
+            self._bytes -= len(page.body)
+            owner_id, key = entry_key
+            keys = self._keys_by_owner.get(owner_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_owner[owner_id]
+
+
+todo_list_cache = TodoListCache()
@@ -0,0 +1,73 @@
+"""
+Cache em memória das claims de tokens JWT já verificados.
+
+Todo request autenticado passa pelo get_current_user, que faria um jwt.decode completo (verificação HMAC,
+parse do JSON e checagem do 'exp'), mesmo o cliente reaproveitando o mesmo token por 20 minutos.
+
+Aqui guardamos o resultado da primeira verificação, indexado pelo SHA-256 do token (o token em si não fica
+guardado na memória), até o 'exp' do próprio token. Depois disso a autenticação vira uma consulta num dicionário.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('TODOAPP_TOKEN_CACHE_SIZE', 10_000))
+
+# Tokens sem 'exp' não expiram pelo JWT, então ficam no cache no máximo por esse tempo (segundos).
+TOKEN_CACHE_MAX_TTL = int(os.getenv('TODOAPP_TOKEN_CACHE_TTL', 20 * 60))
+
+
+class TokenCache:
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES, max_ttl: int = TOKEN_CACHE_MAX_TTL):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, claims = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token: str, claims: dict, exp=None):
+        expires_at = time.time() + self.max_ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            # LRU: ao passar do limite descarta o token usado há mais tempo.
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+token_cache = TokenCache()
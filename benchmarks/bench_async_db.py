@@ -0,0 +1,67 @@
+"""
+Benchmark de concorrência do caminho de banco dos routers do TodoApp.
+
+Sobe o TodoApp num uvicorn (um único worker, dentro do processo), popula um banco SQLite temporário
+e dispara 200 clientes concorrentes lendo '/todos/' e '/todos/todo/{id}'.
+
+Para comparar antes/depois, rode uma vez neste checkout e outra apontando para um checkout anterior:
+
+    python -m benchmarks.bench_async_db
+    git worktree add /tmp/todoapp-before <commit>
+    python -m benchmarks.bench_async_db --app-root /tmp/todoapp-before
+"""
+
+import argparse
+import asyncio
+import importlib
+
+from benchmarks.harness import (add_app_root, login, report, run_load, seed_todoapp,
+                                serve, summarize, temporary_workdir)
+
+
+async def drive(base_url, usernames, concurrency, total_requests, todos_per_user):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        headers = [await login(client, name) for name in usernames]
+
+    async def list_todos(client, i):
+        return await client.get('/todos/', headers=headers[i % len(headers)])
+
+    async def read_todo(client, i):
+        owner = i % len(headers)
+        todo_id = owner * todos_per_user + (i % todos_per_user) + 1
+        return await client.get(f'/todos/todo/{todo_id}', headers=headers[owner])
+
+    results = {}
+    for name, make_request in (('GET /todos/', list_todos), ('GET /todos/todo/{id}', read_todo)):
+        latencies, elapsed, statuses = await run_load(base_url, make_request, concurrency, total_requests)
+        results[name] = summarize(latencies, elapsed, statuses)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app-root', help='checkout cujo pacote TodoApp será medido (padrão: este repositório)')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--todos-per-user', type=int, default=50)
+    args = parser.parse_args()
+
+    add_app_root(args.app_root)
+    with temporary_workdir():
+        main_module = importlib.import_module('TodoApp.main')
+        database = importlib.import_module('TodoApp.database')
+        usernames = seed_todoapp(database.engine, args.users, args.todos_per_user)
+
+        with serve(main_module.app) as base_url:
+            results = asyncio.run(
+                drive(base_url, usernames, args.concurrency, args.requests, args.todos_per_user)
+            )
+
+    report({'benchmark': 'async_db', 'concurrency': args.concurrency, 'results': results})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Custo das buscas do books/books.py com um catálogo grande (padrão: 1 milhão de livros).
+
+Chama as funções das rotas diretamente (sem HTTP, para medir só a busca) e imprime o tempo médio por chamada de cada rota:
+
+    python -m benchmarks.bench_books_indexes
+    python -m benchmarks.bench_books_indexes --app-root ../checkout-antigo --books 200000
+
+O catálogo é semeado com 'BOOKS.extend(...)', que funciona tanto com a lista antiga quanto com o BookStore.
+"""
+
+import argparse
+import asyncio
+import importlib
+import time
+
+from benchmarks.harness import add_app_root, report
+
+CATEGORIES = ['science', 'history', 'math']
+
+
+def seed(books_module, count, authors):
+    books_module.BOOKS.extend(
+        {'title': f'Bench Title {n}', 'author': f'Author {n % authors}', 'category': CATEGORIES[n % 3]}
+        for n in range(count)
+    )
+
+
+async def timed(call, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        await call(i)
+    return round((time.perf_counter() - start) / calls * 1000, 3)
+
+
+async def drive(books, args):
+    n, authors = args.books, args.authors
+    return {
+        'read_book_ms': await timed(lambda i: books.read_book(f'BENCH TITLE {i * 7919 % n}'), args.calls),
+        'read_category_by_query_ms': await timed(lambda i: books.read_category_by_query(CATEGORIES[i % 3].upper()), args.calls),
+        'read_author_category_by_query_ms': await timed(
+            lambda i: books.read_author_category_by_query(f'author {i % authors}', CATEGORIES[i % 3]), args.calls
+        ),
+        'all_books_one_author_ms': await timed(lambda i: books.all_books_one_author(f'AUTHOR {i % authors}'), args.calls),
+        'update_book_ms': await timed(
+            lambda i: books.update_book({'title': f'bench title {i * 7919 % n}', 'author': 'Updated', 'category': 'math'}), args.calls
+        ),
+        'create_book_ms': await timed(lambda i: books.create_book({'title': f'Created {i}', 'author': 'Bench', 'category': 'math'}), args.calls),
+        'delete_book_ms': await timed(lambda i: books.delete_book(f'created {i}'), args.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app-root', help='checkout cujo books/books.py será medido (padrão: este repositório)')
+    parser.add_argument('--books', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=10_000, help='autores distintos no catálogo')
+    parser.add_argument('--calls', type=int, default=20, help='chamadas medidas por rota')
+    args = parser.parse_args()
+
+    add_app_root(args.app_root)
+    books = importlib.import_module('books.books')
+
+    start = time.perf_counter()
+    seed(books, args.books, args.authors)
+    seed_seconds = time.perf_counter() - start
+
+    results = asyncio.run(drive(books, args))
+    report({'benchmark': 'books_indexes', 'books': args.books, 'seed_seconds': round(seed_seconds, 2), 'per_call': results})
+
+
+if __name__ == '__main__':
+    main()
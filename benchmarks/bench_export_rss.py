@@ -0,0 +1,138 @@
+"""
+Memória (RSS) do processo durante a exportação em streaming de GET /admin/todo/export.
+
+Popula um SQLite temporário com '--rows' todos (1 milhão por padrão), sobe o app num uvicorn dentro do processo e baixa
+a exportação inteira descartando os bytes. Uma thread amostra o RSS do processo enquanto isso, e o resultado mostra o RSS
+ao passar por 10%, 25%, 50%, 75% e 100% das linhas: com streaming a memória anônima (heap) fica estável do começo ao fim.
+
+Para comparar, '--full-load' mede também o jeito antigo (carregar todos os objetos do ORM e gerar um único JSON),
+num processo separado para não herdar a memória já alocada pela exportação.
+
+    python -m benchmarks.bench_export_rss --rows 1000000 --format csv --full-load
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.harness import REPO_ROOT, add_app_root, report, serve, temporary_workdir
+
+CHECKPOINTS = (0.1, 0.25, 0.5, 0.75, 1.0)
+
+FULL_LOAD_SCRIPT = '''
+import json
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from TodoApp.models import Todos
+from benchmarks.bench_export_rss import rss_mib
+before = rss_mib()
+with Session(create_engine('sqlite:///./bench_export.db')) as db:
+    todos = db.scalars(select(Todos)).all()
+    body = json.dumps([{c: getattr(t, c) for c in ('id', 'title', 'description', 'priority', 'complete', 'owner_id')} for t in todos])
+print(json.dumps({'rss_anon_before_mib': before, 'rss_anon_after_mib': rss_mib(), 'body_mib': round(len(body) / 2**20, 1)}))
+'''
+
+
+def rss_mib(kind='RssAnon'):
+    """
+    RSS do processo em MiB, lido de /proc/self/status.
+
+    'RssAnon' é a memória alocada pelo processo (heap, buffers). 'RssFile' são páginas de arquivos mapeadas,
+    e inclui o banco lido via mmap (PRAGMA mmap_size), que cresce com o tamanho do arquivo lido mas é cache do SO.
+    """
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(kind + ':'):
+                return round(int(line.split()[1]) / 1024, 1)
+
+
+def seed(engine, Todos, Users, rows, batch_size=50_000):
+    # Cria só as tabelas (sem os triggers de busca e estatísticas, que não entram na exportação e deixariam a carga lenta).
+    Users.__table__.create(engine)
+    Todos.__table__.create(engine)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch_size):
+            connection.execute(Todos.__table__.insert(), [
+                {'title': f'Todo {n}', 'description': f'Exported todo number {n}', 'priority': n % 5 + 1,
+                 'complete': n % 3 == 0, 'owner_id': n % 1000 + 1}
+                for n in range(start, min(start + batch_size, rows))
+            ])
+
+
+async def export(base_url, fmt, rows):
+    import httpx
+
+    samples = []
+    stop = threading.Event()
+
+    def sampler():
+        while not stop.is_set():
+            samples.append(rss_mib())
+            time.sleep(0.02)
+
+    thread = threading.Thread(target=sampler, daemon=True)
+    thread.start()
+    lines, checkpoints, next_checkpoint = 0, {}, 0
+    started = time.perf_counter()
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+            async with client.stream('GET', '/admin/todo/export', params={'format': fmt}) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_raw():
+                    lines += chunk.count(b'\n')
+                    while next_checkpoint < len(CHECKPOINTS) and lines >= CHECKPOINTS[next_checkpoint] * rows:
+                        checkpoints[f'{int(CHECKPOINTS[next_checkpoint] * 100)}%'] = {'anon': rss_mib(), 'file': rss_mib('RssFile')}
+                        next_checkpoint += 1
+    finally:
+        stop.set()
+        thread.join()
+    return {
+        'lines': lines,
+        'seconds': round(time.perf_counter() - started, 2),
+        'rss_mib_at': checkpoints,
+        'rss_anon_peak_mib': max(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=('ndjson', 'csv'), default='ndjson')
+    parser.add_argument('--full-load', action='store_true', help='mede também a carga de tudo em memória num processo separado')
+    args = parser.parse_args()
+
+    add_app_root()
+    with temporary_workdir():
+        os.environ['TODOAPP_DATABASE_URL'] = 'sqlite:///./bench_export.db'
+        os.environ['TODOAPP_CREATE_SCHEMA'] = '0'
+        from TodoApp import database, main as todoapp
+        from TodoApp.models import Todos, Users
+        from TodoApp.routers import admin
+
+        seed(database.engine, Todos, Users, args.rows)
+        database.engine.dispose()
+
+        # Sem login: o foco aqui é a memória da exportação.
+        todoapp.app.dependency_overrides[admin.get_current_user] = lambda: {'id': 1, 'role': 'admin'}
+        rss_before = rss_mib()
+        with serve(todoapp.app) as base_url:
+            result = asyncio.run(export(base_url, args.format, args.rows))
+
+        output = {'benchmark': 'export_rss', 'rows': args.rows, 'format': args.format, 'rss_anon_before_mib': rss_before, 'streaming': result}
+        if args.full_load:
+            completed = subprocess.run(
+                [sys.executable, '-c', FULL_LOAD_SCRIPT], capture_output=True, text=True, check=True,
+                env={**os.environ, 'PYTHONPATH': REPO_ROOT}
+            )
+            output['full_load'] = json.loads(completed.stdout)
+
+    report(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Latência de GET '/todos/' durante uma enxurrada de logins com senha errada (POST '/auth/token'), com e sem o limite de
+tentativas de login (login_throttle.py).
+
+Para cada perfil a leitura é medida duas vezes: sozinha (baseline) e durante '--flood-rate' tentativas de login por segundo.
+A enxurrada imita credential stuffing: as tentativas vêm de '--flood-ips' IPs diferentes (via X-Forwarded-For, que o
+uvicorn aceita de 127.0.0.1) contra '--flood-targets' contas que existem.
+
+    - unthrottled → todas as tentativas chegam ao bcrypt e disputam a CPU com as leituras
+    - throttled   → depois das primeiras tentativas por conta/IP a resposta é um 429, sem bcrypt
+
+    python -m benchmarks.bench_login_flood
+
+Com o limite ligado a latência de '/todos/' durante a enxurrada deve ficar perto da baseline. Tentativas com um username
+diferente por requisição e um IP diferente por requisição passam pelos dois baldes; contra isso só um limite global ajuda.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+
+import httpx
+
+from benchmarks.harness import add_app_root, login, report, run_load, seed_todoapp, serve, summarize, temporary_workdir
+
+PROFILES = ('unthrottled', 'throttled')
+
+
+async def flood(base_url, stop, rate, ips, targets):
+    """
+    Tenta logar com senha errada a 'rate' tentativas por segundo até 'stop' ser sinalizado. Devolve a contagem por status.
+
+    A taxa é fixa (um atacante não espera a resposta para mandar a próxima): com um número fixo de clientes a enxurrada
+    se limitaria sozinha quando cada tentativa fica presa no bcrypt, e o custo que ela impõe ao app não apareceria.
+    """
+    statuses = Counter()
+    loop = asyncio.get_running_loop()
+
+    # Sem limite de conexões no cliente: as tentativas que o servidor não consegue atender se acumulam nele, não aqui.
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def attempt(i):
+            try:
+                response = await client.post(
+                    '/auth/token',
+                    data={'username': targets[i % len(targets)], 'password': 'wrong-password'},
+                    headers={'X-Forwarded-For': f'10.0.{i % ips // 256}.{i % ips % 256}'}
+                )
+            except httpx.TimeoutException:
+                statuses['timeout'] += 1
+            else:
+                statuses[response.status_code] += 1
+
+        attempts = []
+        next_at = loop.time()
+        while not stop.is_set():
+            attempts.append(asyncio.create_task(attempt(len(attempts))))
+            next_at += 1 / rate
+            await asyncio.sleep(max(0, next_at - loop.time()))
+        await asyncio.gather(*attempts)
+    return {str(code): count for code, count in sorted(statuses.items(), key=lambda item: str(item[0]))}
+
+
+async def drive(base_url, headers, usernames, args):
+    async def read_todos(client, i):
+        return await client.get('/todos/', headers=headers)
+
+    baseline = summarize(*await run_load(base_url, read_todos, args.readers, args.requests))
+
+    stop = asyncio.Event()
+    flood_task = asyncio.create_task(flood(base_url, stop, args.flood_rate, args.flood_ips, usernames[1:args.flood_targets + 1]))
+    # Deixa a enxurrada ocupar a CPU antes de medir. Com o limite ligado, as primeiras tentativas de cada conta (o 'burst')
+    # ainda chegam ao bcrypt: o aquecimento precisa ser longo o bastante para medir o regime em que só sobra o reabastecimento.
+    await asyncio.sleep(args.warmup)
+    during_flood = summarize(*await run_load(base_url, read_todos, args.readers, args.requests))
+    stop.set()
+    login_attempts = await flood_task
+
+    return {'baseline': baseline, 'during_flood': during_flood, 'login_attempts': login_attempts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--flood-rate', type=float, default=50, help='tentativas de login por segundo')
+    parser.add_argument('--flood-ips', type=int, default=200)
+    parser.add_argument('--flood-targets', type=int, default=5)
+    parser.add_argument('--warmup', type=float, default=20.0)
+    parser.add_argument('--profile', choices=PROFILES, action='append', help='padrão: todos os perfis')
+    args = parser.parse_args()
+
+    results = {}
+    with temporary_workdir():
+        add_app_root()
+        from TodoApp import database, main as todo_main
+        from TodoApp.login_throttle import InMemoryTokenBuckets, login_throttle
+
+        usernames = seed_todoapp(database.engine, args.flood_targets + 1, todos_per_user=20)
+        with serve(todo_main.app) as base_url:
+            async def login_reader():
+                async with httpx.AsyncClient(base_url=base_url) as client:
+                    return await login(client, usernames[0])
+
+            headers = asyncio.run(login_reader())
+            for profile in args.profile or PROFILES:
+                # O harness desliga o limite por padrão; aqui ele é ligado (com baldes novos) só no perfil 'throttled'.
+                login_throttle.enabled = profile == 'throttled'
+                login_throttle.backend = InMemoryTokenBuckets()
+                results[profile] = asyncio.run(drive(base_url, headers, usernames, args))
+
+    report({
+        'benchmark': 'login_flood',
+        'readers': args.readers,
+        'flood_rate': args.flood_rate,
+        'flood_ips': args.flood_ips,
+        'flood_targets': args.flood_targets,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Overhead por requisição do MetricsMiddleware.
+
+Chama diretamente (sem rede) um app ASGI mínimo, com e sem o middleware, e mede a diferença por requisição:
+
+    python -m benchmarks.bench_metrics_overhead
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.harness import add_app_root, report
+
+
+class FakeRoute:
+    path = '/todos/todo/{todo_id}'
+
+
+async def plain_app(scope, receive, send):
+    scope['route'] = FakeRoute
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{}'})
+
+
+async def noop_send(message):
+    pass
+
+
+async def noop_receive():
+    return {'type': 'http.request', 'body': b''}
+
+
+async def timed(app, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app({'type': 'http', 'method': 'GET', 'path': '/todos/todo/1'}, noop_receive, noop_send)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200_000)
+    args = parser.parse_args()
+
+    add_app_root()
+    from TodoApp.metrics import Metrics, MetricsMiddleware
+
+    wrapped = MetricsMiddleware(plain_app, Metrics())
+
+    async def run():
+        await timed(plain_app, 1000)
+        await timed(wrapped, 1000)
+        return await timed(plain_app, args.iterations), await timed(wrapped, args.iterations)
+
+    without_middleware, with_middleware = asyncio.run(run())
+    report({
+        'benchmark': 'metrics_overhead',
+        'iterations': args.iterations,
+        'without_middleware_us': round(without_middleware * 1e6, 3),
+        'with_middleware_us': round(with_middleware * 1e6, 3),
+        'overhead_us': round((with_middleware - without_middleware) * 1e6, 3),
+    })
+
+
+if __name__ == '__main__':
+    main()
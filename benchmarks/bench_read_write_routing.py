@@ -0,0 +1,137 @@
+"""
+Vazão de leitura do TodoApp com escritas acontecendo ao mesmo tempo, variando o número de workers do uvicorn.
+
+Leitores fazem GET '/todos/todo/{id}' (sessão do engine somente leitura, database.ReadSessionLocal) enquanto escritores
+fazem POST '/todos/todo' (engine de escrita, com pool pequeno). Para cada quantidade de workers em '--workers' o app sobe
+num 'uvicorn --workers N' em subprocesso, apontando para o mesmo SQLite temporário, e o resultado mostra leituras e escritas
+por segundo: com WAL e as leituras num pool próprio, a vazão de leitura cresce com os workers sem travar as escritas.
+
+Dois perfis por quantidade de workers:
+
+    - routed      → padrão do database.py (leituras no engine mode=ro, pool grande; escritas no pool pequeno)
+    - single_pool → leituras na mesma URL e com o mesmo tamanho de pool das escritas, como antes da separação
+
+    python -m benchmarks.bench_read_write_routing --workers 1,2,4
+
+A vazão só cresce com os workers se houver CPUs livres para eles (o cliente de carga também roda nesta máquina).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import create_engine
+
+from benchmarks.harness import REPO_ROOT, add_app_root, free_port, login, report, run_load, seed_todoapp, summarize, temporary_workdir
+
+DATABASE_URL = 'sqlite:///./todosapp.db'
+ASYNC_DATABASE_URL = 'sqlite+aiosqlite:///./todosapp.db'
+
+PROFILES = {
+    'routed': {},
+    'single_pool': {
+        'TODOAPP_READ_DATABASE_URL': ASYNC_DATABASE_URL,
+        'TODOAPP_READ_POOL_SIZE': os.getenv('TODOAPP_WRITE_POOL_SIZE', '4'),
+        'TODOAPP_READ_MAX_OVERFLOW': os.getenv('TODOAPP_WRITE_MAX_OVERFLOW', '2'),
+    },
+}
+
+
+@contextlib.contextmanager
+def uvicorn_workers(workers, env, workdir):
+    """Sobe 'uvicorn TodoApp.main:app --workers N' no diretório do banco e espera o /healthy responder."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'TodoApp.main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning',
+         '--timeout-keep-alive', '120', '--timeout-graceful-shutdown', '5'],
+        # Sem o log de queries lentas: com a CPU saturada quase toda query passa do limite, e o EXPLAIN extra distorce a medida.
+        cwd=workdir, env={**os.environ, 'TODOAPP_SLOW_QUERY_MS': '60000', **env, 'PYTHONPATH': REPO_ROOT, 'TODOAPP_CREATE_SCHEMA': '0'},
+        start_new_session=True,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            with contextlib.suppress(httpx.HTTPError):
+                if httpx.get(f'{base_url}/healthy').status_code == 200:
+                    break
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f'uvicorn with {workers} workers did not start')
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        # Sinaliza o grupo de processos inteiro (os workers são filhos do processo do uvicorn) e, depois do desligamento,
+        # mata o que sobrou para nenhum worker continuar segurando o banco do próximo perfil.
+        os.killpg(process.pid, signal.SIGTERM)
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            process.wait(timeout=30)
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+async def drive(base_url, usernames, args):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        headers = [await login(client, name) for name in usernames]
+
+    async def read_todo(client, i):
+        owner = i % len(headers)
+        todo_id = owner * args.todos_per_user + (i % args.todos_per_user) + 1
+        return await client.get(f'/todos/todo/{todo_id}', headers=headers[owner])
+
+    async def create_todo(client, i):
+        return await client.post('/todos/todo', headers=headers[i % len(headers)], json={
+            'title': f'Write {i}', 'description': 'Routing load write', 'priority': 3, 'complete': False
+        })
+
+    (read_latencies, read_elapsed, read_statuses), (write_latencies, write_elapsed, write_statuses) = await asyncio.gather(
+        run_load(base_url, read_todo, args.readers, args.requests),
+        run_load(base_url, create_todo, args.writers, args.requests // 4),
+    )
+    return {
+        'reads': summarize(read_latencies, read_elapsed, read_statuses),
+        'writes': summarize(write_latencies, write_elapsed, write_statuses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,2,4', help='quantidades de workers do uvicorn, separadas por vírgula')
+    parser.add_argument('--readers', type=int, default=100)
+    parser.add_argument('--writers', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--todos-per-user', type=int, default=100)
+    parser.add_argument('--profile', choices=PROFILES, action='append', help='padrão: todos os perfis')
+    args = parser.parse_args()
+
+    results = {}
+    with temporary_workdir() as workdir:
+        add_app_root()
+        engine = create_engine(DATABASE_URL)
+        usernames = seed_todoapp(engine, args.users, args.todos_per_user)
+        engine.dispose()
+
+        for workers in (int(n) for n in args.workers.split(',')):
+            for profile in args.profile or PROFILES:
+                with uvicorn_workers(workers, PROFILES[profile], workdir) as base_url:
+                    results.setdefault(f'workers_{workers}', {})[profile] = asyncio.run(drive(base_url, usernames, args))
+
+    report({
+        'benchmark': 'read_write_routing',
+        'cpus': os.cpu_count(),
+        'readers': args.readers,
+        'writers': args.writers,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
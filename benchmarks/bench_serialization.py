@@ -0,0 +1,69 @@
+"""
+Microbenchmark da serialização de uma listagem de 10 mil todos (objetos do SQLAlchemy) para JSON.
+
+Compara o caminho antigo (handler devolvendo os objetos do ORM, que o FastAPI passa pelo jsonable_encoder
+e pelo json.dumps do JSONResponse) com os response models tipados e, opcionalmente, com o ORJSONResponse:
+
+    python -m benchmarks.bench_serialization --todos 10000
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.harness import add_app_root, report
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'best_ms': round(min(timings) * 1000, 2), 'mean_ms': round(statistics.fmean(timings) * 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--todos', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    add_app_root()
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from TodoApp.models import Todos
+    from TodoApp.routers.todos import serialize_todos, todo_list_adapter
+
+    todos = [
+        Todos(id=n, title=f'Todo {n}', description='Serialization benchmark', priority=n % 5 + 1,
+              complete=n % 2 == 0, owner_id=1)
+        for n in range(1, args.todos + 1)
+    ]
+
+    results = {
+        # Antes: o FastAPI sem response_model caía no jsonable_encoder, que percorre o __dict__ de cada objeto.
+        'orm_jsonable_encoder_json': best_of(lambda: JSONResponse(jsonable_encoder(todos)), args.repeat),
+        # Depois: response model validado dos atributos e serializado direto para bytes pelo pydantic-core.
+        'response_model_dump_json': best_of(lambda: serialize_todos(todos), args.repeat),
+    }
+
+    try:
+        from fastapi.responses import ORJSONResponse
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        results['response_model_orjson'] = best_of(
+            lambda: ORJSONResponse(
+                todo_list_adapter.dump_python(todo_list_adapter.validate_python(todos, from_attributes=True))
+            ),
+            args.repeat
+        )
+
+    report({'benchmark': 'serialization', 'todos': args.todos, 'results': results})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Vazão de escrita do TodoApp (POST '/todos/todo') conforme o número de shards (TODOAPP_SHARD_COUNT) cresce.
+
+Cada usuário escreve no shard dele, e cada shard é um arquivo SQLite com o seu próprio lock de escrita: com mais shards
+menos escritores disputam o mesmo lock. Cada quantidade de shards roda num subprocesso próprio (o TODOAPP_SHARD_COUNT
+é lido na importação do database.py), com o app num uvicorn dentro do processo e '--writers' clientes concorrentes
+espalhados entre '--users' usuários.
+
+    python -m benchmarks.bench_shard_writes --shards 1,2,4,8
+
+'--synchronous FULL' faz cada commit esperar o fsync, o que deixa o lock de escrita preso por mais tempo
+e mostra melhor o efeito de dividir as escritas entre arquivos.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from benchmarks.harness import (REPO_ROOT, add_app_root, login, report, run_load, seed_todoapp,
+                                serve, summarize, temporary_workdir)
+
+
+async def drive(base_url, usernames, writers, requests):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        headers = [await login(client, name) for name in usernames]
+
+    async def create_todo(client, i):
+        return await client.post('/todos/todo', headers=headers[i % len(headers)], json={
+            'title': f'Write {i}', 'description': 'Sharded write', 'priority': i % 5 + 1, 'complete': False
+        })
+
+    latencies, elapsed, statuses = await run_load(base_url, create_todo, writers, requests)
+    return summarize(latencies, elapsed, statuses)
+
+
+def run_shard_count(args):
+    add_app_root()
+    with temporary_workdir():
+        from TodoApp import database, main
+        usernames = seed_todoapp(database.engine, args.users, todos_per_user=0)
+        with serve(main.app) as base_url:
+            writes = asyncio.run(drive(base_url, usernames, args.writers, args.requests))
+        users_per_shard = Counter(database.shard_for_owner(owner_id) for owner_id in range(1, args.users + 1))
+        return {'writes': writes, 'users_per_shard': dict(sorted(users_per_shard.items()))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shards', default='1,2,4,8', help='quantidades de shards, separadas por vírgula')
+    parser.add_argument('--writers', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=64)
+    parser.add_argument('--synchronous', default='NORMAL', choices=('OFF', 'NORMAL', 'FULL'))
+    parser.add_argument('--run-one', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_shard_count(args)))
+        return
+
+    results = {}
+    for shard_count in args.shards.split(','):
+        env = {**os.environ, 'TODOAPP_SHARD_COUNT': shard_count, 'TODOAPP_SQLITE_SYNCHRONOUS': args.synchronous}
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_shard_writes', '--run-one', *sys.argv[1:]],
+            cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        results[f'shards_{shard_count}'] = json.loads(output.strip().splitlines()[-1])
+
+    report({
+        'benchmark': 'shard_writes',
+        'writers': args.writers,
+        'users': args.users,
+        'synchronous': args.synchronous,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
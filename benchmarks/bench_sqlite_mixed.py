@@ -0,0 +1,93 @@
+"""
+Carga mista de leitura/escrita no TodoApp, comparando o SQLite padrão com os PRAGMAs de produção do database.py.
+
+Leitores fazem GET '/todos/todo/{id}' enquanto escritores fazem POST '/todos/todo' ao mesmo tempo.
+Cada perfil roda num subprocesso próprio, porque os PRAGMAs são lidos das variáveis de ambiente na importação:
+
+    python -m benchmarks.bench_sqlite_mixed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import (REPO_ROOT, add_app_root, login, report, run_load, seed_todoapp,
+                                serve, summarize, temporary_workdir)
+
+PROFILES = {
+    # Comportamento antigo: rollback journal e fsync completo em cada commit.
+    'default': {
+        'TODOAPP_SQLITE_JOURNAL_MODE': 'DELETE', 'TODOAPP_SQLITE_SYNCHRONOUS': 'FULL',
+        'TODOAPP_SQLITE_CACHE_SIZE': '', 'TODOAPP_SQLITE_MMAP_SIZE': '', 'TODOAPP_SQLITE_TEMP_STORE': '',
+    },
+    # Valores padrão do database.py.
+    'tuned': {},
+}
+
+
+async def drive(base_url, usernames, readers, writers, requests, todos_per_user):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        headers = [await login(client, name) for name in usernames]
+
+    async def read_todo(client, i):
+        owner = i % len(headers)
+        todo_id = owner * todos_per_user + (i % todos_per_user) + 1
+        return await client.get(f'/todos/todo/{todo_id}', headers=headers[owner])
+
+    async def create_todo(client, i):
+        return await client.post('/todos/todo', headers=headers[i % len(headers)], json={
+            'title': f'Write {i}', 'description': 'Mixed load write', 'priority': 3, 'complete': False
+        })
+
+    (read_latencies, read_elapsed, read_statuses), (write_latencies, write_elapsed, write_statuses) = await asyncio.gather(
+        run_load(base_url, read_todo, readers, requests),
+        run_load(base_url, create_todo, writers, requests // 4),
+    )
+    return {
+        'reads': summarize(read_latencies, read_elapsed, read_statuses),
+        'writes': summarize(write_latencies, write_elapsed, write_statuses),
+    }
+
+
+def run_profile(args):
+    add_app_root()
+    with temporary_workdir():
+        from TodoApp import database, main
+        usernames = seed_todoapp(database.engine, args.users, args.todos_per_user)
+        with serve(main.app) as base_url:
+            return asyncio.run(drive(base_url, usernames, args.readers, args.writers, args.requests, args.todos_per_user))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=50)
+    parser.add_argument('--writers', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--todos-per-user', type=int, default=100)
+    parser.add_argument('--profile', choices=PROFILES)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args)))
+        return
+
+    results = {}
+    for profile, overrides in PROFILES.items():
+        env = {**os.environ, **overrides}
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_sqlite_mixed', '--profile', profile, *sys.argv[1:]],
+            cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        results[profile] = json.loads(output.strip().splitlines()[-1])
+
+    report({'benchmark': 'sqlite_mixed', 'readers': args.readers, 'writers': args.writers, 'results': results})
+
+
+if __name__ == '__main__':
+    main()
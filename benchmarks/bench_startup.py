@@ -0,0 +1,112 @@
+"""
+Tempo de startup do TodoApp: import a frio do 'TodoApp.main' e latência da primeira requisição.
+
+Cada execução roda num processo Python novo (sem nada em cache em sys.modules), dentro de um diretório temporário vazio:
+
+    - 'python -X importtime' mede o import do app e lista os pacotes mais caros;
+    - um segundo processo mede import + startup (lifespan, que cria as tabelas) + a primeira requisição sem banco ('/healthy')
+      + a primeira requisição que usa o banco (login de um usuário que não existe: uma query, sem bcrypt);
+    - também confere se importar o app criou algum arquivo no diretório (não deveria).
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --app-root ../checkout-antigo --runs 10
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from benchmarks.harness import add_app_root, report, temporary_workdir
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')  # self (us) | cumulative (us) | módulo
+
+FIRST_REQUEST_SCRIPT = '''
+import json, os, time
+start = time.perf_counter()
+from TodoApp.main import app
+imported = time.perf_counter()
+files_after_import = os.listdir('.')
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    started = time.perf_counter()
+    client.get('/healthy')
+    healthy = time.perf_counter()
+    client.post('/auth/token', data={'username': 'nobody', 'password': 'nothing'})
+    first_db = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'startup_ms': (started - imported) * 1000,
+    'first_request_ms': (healthy - started) * 1000,
+    'first_db_request_ms': (first_db - healthy) * 1000,
+    'files_after_import': files_after_import,
+}))
+'''
+
+
+def run_python(args, app_root):
+    env = {**os.environ, 'PYTHONPATH': app_root}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env)
+
+
+def import_profile(app_root, top):
+    """
+    Roda 'python -X importtime' e devolve o tempo total do import do app e os pacotes mais caros.
+
+    O custo de cada pacote é a soma do tempo próprio ('self') dos seus módulos, então os números não se sobrepõem
+    (o tempo acumulado do fastapi, por exemplo, incluiria o do pydantic e do starlette).
+    """
+    stderr = run_python(['-X', 'importtime', '-c', 'import TodoApp.main'], app_root).stderr
+    total_us = 0
+    per_package = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = int(match.group(1)), int(match.group(2)), match.group(4)
+            package = name.split('.')[0]
+            per_package[package] = per_package.get(package, 0) + self_us
+            if name == 'TodoApp.main':
+                total_us = cumulative_us
+
+    slowest = sorted(per_package.items(), key=lambda item: -item[1])[:top]
+    return total_us / 1000, [{'package': package, 'self_ms': round(us / 1000, 2)} for package, us in slowest]
+
+
+def median_of(runs, key):
+    return round(statistics.median(run[key] for run in runs), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app-root', help='checkout cujo pacote TodoApp será medido (padrão: este repositório)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='quantos pacotes mais caros listar')
+    args = parser.parse_args()
+
+    app_root = add_app_root(args.app_root)
+    import_totals, first_requests, top_packages = [], [], []
+    for _ in range(args.runs):
+        with temporary_workdir():
+            total_ms, top_packages = import_profile(app_root, args.top)
+            import_totals.append(total_ms)
+        with temporary_workdir():
+            first_requests.append(json.loads(run_python(['-c', FIRST_REQUEST_SCRIPT], app_root).stdout))
+
+    report({
+        'benchmark': 'startup',
+        'runs': args.runs,
+        'importtime_main_ms_p50': round(statistics.median(import_totals), 2),
+        'import_ms_p50': median_of(first_requests, 'import_ms'),
+        'startup_ms_p50': median_of(first_requests, 'startup_ms'),
+        'first_request_ms_p50': median_of(first_requests, 'first_request_ms'),
+        'first_db_request_ms_p50': median_of(first_requests, 'first_db_request_ms'),
+        'files_created_by_import': sorted({name for run in first_requests for name in run['files_after_import']}),
+        'slowest_packages': top_packages,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark das consultas por usuário na tabela 'todos', com e sem os índices de owner_id.
+
+Popula um SQLite temporário com '--rows' todos (1 milhão por padrão) espalhados entre '--owners' usuários,
+mede as consultas que os routers fazem sem os índices compostos e depois de criá-los:
+
+    python -m benchmarks.bench_todo_indexes --rows 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, select
+
+from benchmarks.harness import add_app_root, report, temporary_workdir
+
+
+def timed(connection, statement, repeat):
+    timings = []
+    for params in repeat:
+        start = time.perf_counter()
+        connection.execute(statement(*params)).all()
+        timings.append(time.perf_counter() - start)
+    return {
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+    }
+
+
+def measure(connection, Todos, owners, rows, lookups):
+    rng = random.Random(42)
+    owner_ids = [rng.randint(1, owners) for _ in range(lookups)]
+    todo_ids = [rng.randint(1, rows) for _ in range(lookups)]
+
+    queries = {
+        # todos.read_all (primeira página da paginação por cursor)
+        'read_all_page': lambda owner: select(Todos).where(Todos.owner_id == owner).where(Todos.id > 0).order_by(Todos.id).limit(100),
+        # todos.read_todo / update_todo / delte_todo
+        'read_todo': lambda owner, todo_id: select(Todos).where(Todos.id == todo_id).where(Todos.owner_id == owner),
+        # listagem filtrada por status e prioridade
+        'filtered': lambda owner: select(Todos).where(Todos.owner_id == owner).where(Todos.complete.is_(False)).where(Todos.priority == 5),
+    }
+    return {
+        'read_all_page': timed(connection, queries['read_all_page'], [(o,) for o in owner_ids]),
+        'read_todo': timed(connection, queries['read_todo'], list(zip(owner_ids, todo_ids))),
+        'filtered': timed(connection, queries['filtered'], [(o,) for o in owner_ids]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--owners', type=int, default=10_000)
+    parser.add_argument('--lookups', type=int, default=50)
+    args = parser.parse_args()
+
+    add_app_root()
+    from TodoApp.models import Todos
+
+    with temporary_workdir():
+        engine = create_engine('sqlite:///./bench_indexes.db')
+        table = Todos.__table__
+        table.create(engine)
+        for index in table.indexes:
+            if index.name.startswith('ix_todos_owner_id'):
+                index.drop(engine)
+
+        rng = random.Random(7)
+        with engine.begin() as connection:
+            batch = []
+            for n in range(args.rows):
+                batch.append({
+                    'title': f'Todo {n}', 'description': 'Benchmark todo', 'priority': rng.randint(1, 5),
+                    'complete': rng.random() < 0.3, 'owner_id': rng.randint(1, args.owners)
+                })
+                if len(batch) == 50_000:
+                    connection.execute(table.insert(), batch)
+                    batch = []
+            if batch:
+                connection.execute(table.insert(), batch)
+
+        with engine.connect() as connection:
+            without_indexes = measure(connection, Todos, args.owners, args.rows, args.lookups)
+
+        for index in table.indexes:
+            if index.name.startswith('ix_todos_owner_id'):
+                index.create(engine)
+
+        with engine.connect() as connection:
+            connection.exec_driver_sql('ANALYZE')
+            with_indexes = measure(connection, Todos, args.owners, args.rows, args.lookups)
+
+        engine.dispose()
+
+    report({
+        'benchmark': 'todo_indexes',
+        'rows': args.rows,
+        'owners': args.owners,
+        'without_owner_indexes': without_indexes,
+        'with_owner_indexes': with_indexes,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark da busca full-text dos todos (GET /todos/search) com uma tabela grande.
+
+Popula um SQLite temporário com '--rows' todos (1 milhão por padrão) espalhados entre '--owners' usuários, com títulos e
+descrições sorteados de um vocabulário em que poucas palavras são muito comuns e a maioria é rara (como em texto real).
+Compara, para termos de frequências diferentes e uma busca por prefixo:
+
+    - fts_owner_token → a consulta do app (search.search_statement: MATCH com o owner_id como token, ordenada por bm25)
+    - fts_global      → MATCH só nos termos e filtro de owner_id fora do FTS (o índice devolve os matches de todos os usuários)
+    - like_scan       → a alternativa sem FTS: índice de owner_id + LIKE '%termo%' em título e descrição (sem ranking)
+
+Também mede o custo dos triggers na escrita (inserts por segundo com e sem o todos_fts).
+
+    python -m benchmarks.bench_todo_search --rows 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, or_, select, text
+
+from benchmarks.harness import add_app_root, report, temporary_workdir
+
+VOCABULARY = [f'word{n}' for n in range(20_000)]
+
+# (nome, texto buscado no app, trecho buscado no LIKE)
+SEARCHES = (
+    ('common_term', 'word0', 'word0 '),
+    ('medium_term', 'word300', 'word300 '),
+    ('rare_term', 'word5000', 'word5000 '),
+    ('prefix', 'word30*', 'word30'),
+)
+
+
+def random_text(rng, words):
+    # Distribuição de Zipf aproximada: o índice sorteado é bem mais provável perto de 0.
+    return ' '.join(VOCABULARY[min(int(rng.paretovariate(1.0) * 50) - 50, len(VOCABULARY) - 1)] for _ in range(words)) + ' '
+
+
+def populate(engine, table, rows, owners, batch_size=50_000):
+    rng = random.Random(7)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        batch = []
+        for n in range(rows):
+            batch.append({
+                'title': random_text(rng, 4), 'description': random_text(rng, 12), 'priority': rng.randint(1, 5),
+                'complete': rng.random() < 0.3, 'owner_id': rng.randint(1, owners)
+            })
+            if len(batch) == batch_size:
+                connection.execute(table.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(table.insert(), batch)
+    return round(rows / (time.perf_counter() - start))
+
+
+def timed(connection, make_statement, owner_ids):
+    timings, hits = [], []
+    for owner in owner_ids:
+        start = time.perf_counter()
+        hits.append(len(connection.execute(make_statement(owner)).all()))
+        timings.append(time.perf_counter() - start)
+    return {
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+        'mean_hits': round(statistics.fmean(hits), 1),
+    }
+
+
+def measure(connection, search, Todos, owner_ids, limit):
+    results = {}
+    for label, q, like in SEARCHES:
+        def fts_owner_token(owner):
+            return search.search_statement(owner, search.match_expression(owner, q), limit, 0)
+
+        def fts_global(owner):
+            # Tira o 'owner_id : "N" AND ' da expressão do app; o filtro por dono fica só no WHERE do search_statement.
+            expression = search.match_expression(owner, q).split(' AND ', 1)[1]
+            return search.search_statement(owner, expression, limit, 0)
+
+        def like_scan(owner):
+            pattern = f'%{like}%'
+            return (
+                select(Todos).where(Todos.owner_id == owner)
+                .where(or_(Todos.title.like(pattern), Todos.description.like(pattern)))
+                .limit(limit)
+            )
+
+        documents = connection.execute(text('SELECT count(*) FROM todos_fts WHERE todos_fts MATCH :q'), {'q': q}).scalar()
+        results[label] = {
+            'query': q,
+            'documents_with_term': documents,
+            'fts_owner_token': timed(connection, fts_owner_token, owner_ids),
+            'fts_global': timed(connection, fts_global, owner_ids),
+            'like_scan': timed(connection, like_scan, owner_ids),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--owners', type=int, default=1_000)
+    parser.add_argument('--lookups', type=int, default=30)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    add_app_root()
+    from TodoApp import search
+    from TodoApp.models import Todos
+
+    with temporary_workdir():
+        plain_engine = create_engine('sqlite:///./bench_plain.db')
+        Todos.__table__.create(plain_engine)
+        plain_inserts = populate(plain_engine, Todos.__table__, min(args.rows, 100_000), args.owners)
+        plain_engine.dispose()
+
+        engine = create_engine('sqlite:///./bench_search.db')
+        Todos.__table__.create(engine)
+        with engine.begin() as connection:
+            search.create_todo_search(None, connection)
+        fts_inserts = populate(engine, Todos.__table__, args.rows, args.owners)
+
+        rng = random.Random(42)
+        owner_ids = [rng.randint(1, args.owners) for _ in range(args.lookups)]
+        with engine.connect() as connection:
+            connection.execute(text('ANALYZE'))
+            results = measure(connection, search, Todos, owner_ids, args.limit)
+        engine.dispose()
+
+    report({
+        'benchmark': 'todo_search',
+        'rows': args.rows,
+        'owners': args.owners,
+        'inserts_per_sec': {'without_fts': plain_inserts, 'with_fts_triggers': fts_inserts},
+        'queries': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Cada benchmark roda dentro de um diretório temporário (os apps usam 'sqlite:///./todosapp.db', relativo ao diretório atual),
+sobe o app num uvicorn dentro do próprio processo e dispara clientes HTTP assíncronos concorrentes contra ele.
+
+Os resultados são impressos em JSON para que execuções diferentes (por exemplo, antes e depois de uma mudança) possam ser comparadas.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import httpx
+import uvicorn
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Os benchmarks logam vários usuários do mesmo IP (127.0.0.1) e medem o login em si, então o limite de tentativas de login
+# fica desligado (vale também para os subprocessos). O bench_login_flood liga de novo para medir o próprio limite.
+os.environ.setdefault('TODOAPP_LOGIN_THROTTLE', '0')
+
+
+def add_app_root(app_root=None):
+    # Permite importar o TodoApp de outro checkout (ex: um 'git worktree' da versão anterior) para comparar antes/depois.
+    root = os.path.abspath(app_root or REPO_ROOT)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    return root
+
+
+@contextlib.contextmanager
+def temporary_workdir():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='todoapp-bench-') as workdir:
+        os.chdir(workdir)
+        try:
+            yield workdir
+        finally:
+            os.chdir(previous)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(app, port=None):
+    """Sobe o app num uvicorn rodando numa thread do próprio processo e devolve a URL base."""
+    port = port or free_port()
+    config = uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning', lifespan='on', timeout_keep_alive=120)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def seed_todoapp(engine, users=10, todos_per_user=100, password='benchmark'):
+    """Cria usuários e todos direto pelo engine síncrono. Devolve a lista de usernames criados."""
+    from passlib.context import CryptContext
+    from sqlalchemy import text
+
+    # Mesmo custo do app (hashing.BCRYPT_ROUNDS): com outro custo o primeiro login de cada usuário refaria o hash.
+    hashed = CryptContext(schemes=['bcrypt'], bcrypt__rounds=int(os.getenv('TODOAPP_BCRYPT_ROUNDS', 12))).hash(password)
+    usernames = [f'user{i}' for i in range(1, users + 1)]
+
+    with engine.begin() as connection:
+        # Importar o app não cria mais as tabelas (elas são criadas no startup); aqui elas são necessárias antes do servidor subir.
+        from TodoApp.models import Base
+        Base.metadata.create_all(bind=connection)
+
+        connection.execute(
+            text(
+                'INSERT INTO users (id, email, username, first_name, last_name, hashed_password, is_active, role, phone_number) '
+                'VALUES (:id, :email, :username, :first_name, :last_name, :hashed_password, 1, :role, :phone_number)'
+            ),
+            [
+                {
+                    'id': i, 'email': f'{name}@example.com', 'username': name, 'first_name': 'Bench',
+                    'last_name': name, 'hashed_password': hashed, 'role': 'admin' if i == 1 else 'user',
+                    'phone_number': '(11) 90000-0000'
+                }
+                for i, name in enumerate(usernames, start=1)
+            ]
+        )
+        if not todos_per_user:
+            return usernames
+        # Os todos vão para o todosapp.db (shard 0): com TODOAPP_SHARD_COUNT > 1 use todos_per_user=0 e crie os todos pela API.
+        connection.execute(
+            text(
+                'INSERT INTO todos (title, description, priority, complete, owner_id) '
+                'VALUES (:title, :description, :priority, :complete, :owner_id)'
+            ),
+            [
+                {
+                    'title': f'Todo {n}', 'description': f'Benchmark todo {n} of user {owner}',
+                    'priority': n % 5 + 1, 'complete': n % 3 == 0, 'owner_id': owner
+                }
+                for owner in range(1, users + 1)
+                for n in range(todos_per_user)
+            ]
+        )
+    return usernames
+
+
+async def login(client, username, password='benchmark'):
+    response = await client.post('/auth/token', data={'username': username, 'password': password})
+    response.raise_for_status()
+    return {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+
+async def run_load(base_url, make_request, concurrency=200, total_requests=5000):
+    """
+    Dispara 'total_requests' requisições com 'concurrency' clientes simultâneos.
+
+    make_request(client, i) deve fazer uma requisição e devolver a resposta.
+    Devolve (latências em segundos, tempo total em segundos, contagem por status code).
+    """
+    latencies = []
+    statuses = {}
+    counter = iter(range(total_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def worker():
+            for i in counter:
+                start = time.perf_counter()
+                response = await make_request(client, i)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, elapsed, statuses
+
+
+async def measure_allocations(base_url, make_request, samples=20, start=0):
+    """
+    Faz 'samples' requisições sequenciais com o tracemalloc ligado e devolve o pico de memória alocada por requisição.
+    'start' desloca os índices passados para make_request (para rotas que consomem dados, como os DELETEs).
+
+    Como o servidor roda no mesmo processo, o número inclui as alocações do cliente httpx (que são as mesmas em todas as rotas).
+    """
+    peaks = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await make_request(client, start)  # aquece conexão e caches
+        tracemalloc.start()
+        try:
+            for i in range(start + 1, start + samples + 1):
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                await make_request(client, i)
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - baseline)
+        finally:
+            tracemalloc.stop()
+    return {'alloc_peak_kib_p50': round(statistics.median(peaks) / 1024, 1)} if peaks else {}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed, statuses=None):
+    return {
+        'requests': len(latencies),
+        'requests_per_sec': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'statuses': {str(code): count for code, count in sorted((statuses or {}).items())},
+    }
+
+
+def report(results):
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,295 @@
+"""
+Suite de benchmark HTTP de todas as rotas do TodoApp e dos apps books/books.py e books/books2.py.
+
+Popula um dataset configurável (usuários, todos e livros), sobe cada app num uvicorn dentro do processo,
+dispara clientes assíncronos concorrentes contra cada rota e imprime, por rota, req/s, p50/p95/p99,
+contagem de status codes e o pico de memória alocada por requisição, em JSON:
+
+    python -m benchmarks.http_suite --output bench_output.txt
+    python -m benchmarks.http_suite --routes todos --concurrency 100
+
+Rotas que fazem bcrypt (login, criação de usuário, troca de senha) usam '--slow-requests' requisições,
+porque cada uma custa centenas de milissegundos de CPU.
+As rotas de escrita rodam depois das de leitura e consomem faixas separadas dos dados semeados.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+
+from benchmarks.harness import (add_app_root, login, measure_allocations, report, run_load,
+                                seed_todoapp, serve, summarize, temporary_workdir)
+
+PASSWORD = 'benchmark'
+
+
+def todo_body(i):
+    return {'title': f'Suite todo {i}', 'description': 'HTTP suite todo', 'priority': i % 5 + 1, 'complete': i % 2 == 0}
+
+
+def todoapp_scenarios(args, headers, admin_headers):
+    users, per_user = args.users, args.todos_per_user
+
+    def owner_and_id(i, first_slot):
+        # Os todos do usuário u (0-based) têm ids u * per_user + 1 .. (u + 1) * per_user.
+        owner = i % users
+        slot = first_slot + i // users
+        return owner, owner * per_user + slot + 1
+
+    async def read_all(client, i):
+        return await client.get('/todos/', params={'limit': 100}, headers=headers[i % users])
+
+    async def read_todo(client, i):
+        owner, todo_id = owner_and_id(i, 0)
+        return await client.get(f'/todos/todo/{todo_id}', headers=headers[owner])
+
+    async def create_todo(client, i):
+        return await client.post('/todos/todo', json=todo_body(i), headers=headers[i % users])
+
+    async def update_todo(client, i):
+        owner, todo_id = owner_and_id(i, i // users % per_user)
+        return await client.put(f'/todos/todo/{todo_id}', json=todo_body(i), headers=headers[owner])
+
+    async def delete_todo(client, i):
+        owner, todo_id = owner_and_id(i, per_user // 2)
+        return await client.delete(f'/todos/todo/{todo_id}', headers=headers[owner])
+
+    async def create_bulk(client, i):
+        return await client.post('/todos/bulk', json=[todo_body(i * args.batch + n) for n in range(args.batch)], headers=headers[i % users])
+
+    async def update_bulk(client, i):
+        owner = i % users
+        body = [{**todo_body(i), 'id': owner * per_user + n + 1} for n in range(args.batch)]
+        return await client.put('/todos/bulk', json=body, headers=headers[owner])
+
+    async def delete_bulk(client, i):
+        owner, first_id = owner_and_id(i * args.batch, 3 * per_user // 4)
+        return await client.request('DELETE', '/todos/bulk', json=[first_id + n for n in range(args.batch)], headers=headers[owner])
+
+    async def search(client, i):
+        return await client.get('/todos/search', params={'q': f'benchmark {i % per_user}'}, headers=headers[i % users])
+
+    async def read_stats(client, i):
+        return await client.get('/todos/stats', headers=headers[i % users])
+
+    async def admin_stats(client, i):
+        return await client.get('/admin/stats', headers=admin_headers)
+
+    async def admin_read_all(client, i):
+        return await client.get('/admin/todo', params={'limit': 100}, headers=admin_headers)
+
+    async def admin_delete(client, i):
+        _, todo_id = owner_and_id(i, per_user // 4)
+        return await client.delete(f'/admin/todo/{todo_id}', headers=admin_headers)
+
+    async def get_user(client, i):
+        return await client.get('/users/', headers=headers[i % users])
+
+    async def change_phone(client, i):
+        return await client.put(f'/users/phonenumber/{11900000000 + i}', headers=headers[i % users])
+
+    async def change_password(client, i):
+        # A nova senha é igual à antiga para não invalidar os logins das outras rotas.
+        return await client.put('/users/password', json={'password': PASSWORD, 'new_password': PASSWORD}, headers=headers[i % users])
+
+    async def token(client, i):
+        return await client.post('/auth/token', data={'username': f'user{i % users + 1}', 'password': PASSWORD})
+
+    async def create_user(client, i):
+        return await client.post('/auth/', json={
+            'username': f'suite-user-{i}', 'email': f'suite-user-{i}@example.com', 'first_name': 'Suite',
+            'last_name': 'User', 'password': PASSWORD, 'role': 'user', 'phone_number': '(11) 90000-0000'
+        })
+
+    async def healthy(client, i):
+        return await client.get('/healthy')
+
+    fast, slow = args.requests, args.slow_requests
+    return [
+        ('GET /healthy', healthy, fast),
+        ('GET /todos/', read_all, fast),
+        ('GET /todos/todo/{id}', read_todo, fast),
+        ('GET /todos/search', search, fast),
+        ('GET /todos/stats', read_stats, fast),
+        ('GET /admin/todo', admin_read_all, fast),
+        ('GET /admin/stats', admin_stats, fast),
+        ('GET /users/', get_user, fast),
+        ('POST /todos/todo', create_todo, fast),
+        ('PUT /todos/todo/{id}', update_todo, fast),
+        ('POST /todos/bulk', create_bulk, fast),
+        ('PUT /todos/bulk', update_bulk, fast),
+        ('PUT /users/phonenumber/{phone}', change_phone, fast),
+        ('DELETE /todos/todo/{id}', delete_todo, fast),
+        ('DELETE /admin/todo/{id}', admin_delete, fast),
+        ('DELETE /todos/bulk', delete_bulk, fast),
+        ('POST /auth/token', token, slow),
+        ('POST /auth/', create_user, slow),
+        ('PUT /users/password', change_password, slow),
+    ]
+
+
+def seed_books(books_module, count):
+    categories = ['science', 'history', 'math']
+    books_module.BOOKS.extend(
+        {'title': f'Bench Title {n}', 'author': f'Author {n % 100}', 'category': categories[n % 3]}
+        for n in range(count)
+    )
+
+
+def books_scenarios(args):
+    async def read_all(client, i):
+        return await client.get('/books')
+
+    async def read_book(client, i):
+        return await client.get(f'/books/title/bench title {i % args.books}')
+
+    async def by_category(client, i):
+        return await client.get('/books/', params={'category': 'science'})
+
+    async def by_author_category(client, i):
+        return await client.get(f'/books/author {i % 100}/', params={'category': 'math'})
+
+    async def create_book(client, i):
+        return await client.post('/books/create_book', json={'title': f'Created {i}', 'author': 'Suite', 'category': 'math'})
+
+    async def update_book(client, i):
+        return await client.put('/books/update_book', json={'title': f'Bench Title {i % args.books}', 'author': 'Updated', 'category': 'science'})
+
+    async def delete_book(client, i):
+        return await client.delete(f'/books/delete_book/Created {i}')
+
+    async def one_author(client, i):
+        return await client.get('/books/all_books_one_author', params={'author': f'author {i % 100}'})
+
+    async def one_author_query(client, i):
+        return await client.get(f'/books/all_books_one_author_query/author {i % 100}')
+
+    fast = args.requests
+    return [
+        ('books.py GET /books', read_all, fast),
+        ('books.py GET /books/title/{title}', read_book, fast),
+        ('books.py GET /books/?category', by_category, fast),
+        ('books.py GET /books/{author}/?category', by_author_category, fast),
+        ('books.py GET /books/all_books_one_author', one_author, fast),
+        ('books.py GET /books/all_books_one_author_query/{author}', one_author_query, fast),
+        ('books.py POST /books/create_book', create_book, fast),
+        ('books.py PUT /books/update_book', update_book, fast),
+        ('books.py DELETE /books/delete_book/{title}', delete_book, fast),
+    ]
+
+
+def seed_books2(books2_module, count):
+    first_id = books2_module.BOOKS.allocate_id()
+    books2_module.BOOKS.extend(
+        books2_module.Book(id=first_id + n, title=f'Bench Book {n}', author=f'Author {n % 100}',
+                           description='Benchmark book', rating=n % 5 + 1, published_date=2000 + n % 24)
+        for n in range(count)
+    )
+    return first_id
+
+
+def books2_scenarios(args, first_id):
+    async def read_all(client, i):
+        return await client.get('/books')
+
+    async def read_book(client, i):
+        return await client.get(f'/books/{first_id + i % args.books}')
+
+    async def by_rating(client, i):
+        return await client.get('/books/', params={'book_rating': i % 5 + 1})
+
+    async def by_published_date(client, i):
+        return await client.get('/books/published/', params={'book_published_date': 2000 + i % 24})
+
+    def book_body(i):
+        return {'title': f'Suite book {i}', 'author': 'Suite', 'description': 'HTTP suite book', 'rating': i % 5 + 1, 'published_date': 2016}
+
+    async def create_book(client, i):
+        return await client.post('/create-book', json=book_body(i))
+
+    async def update_book(client, i):
+        return await client.put('/books/update_book', json={**book_body(i), 'id': first_id + i % args.books})
+
+    async def delete_book(client, i):
+        # Apaga de trás para frente para não colidir com os ids usados pelas leituras do começo do catálogo.
+        return await client.delete(f'/books/{first_id + args.books - 1 - i}')
+
+    fast = args.requests
+    return [
+        ('books2.py GET /books', read_all, fast),
+        ('books2.py GET /books/{id}', read_book, fast),
+        ('books2.py GET /books/?book_rating', by_rating, fast),
+        ('books2.py GET /books/published/?book_published_date', by_published_date, fast),
+        ('books2.py POST /create-book', create_book, fast),
+        ('books2.py PUT /books/update_book', update_book, fast),
+        ('books2.py DELETE /books/{id}', delete_book, fast),
+    ]
+
+
+async def run_scenarios(base_url, scenarios, args):
+    results = {}
+    for name, make_request, requests in scenarios:
+        if args.routes and not any(fragment in name for fragment in args.routes):
+            continue
+        latencies, elapsed, statuses = await run_load(base_url, make_request, args.concurrency, requests)
+        results[name] = summarize(latencies, elapsed, statuses)
+        if args.alloc_samples:
+            results[name].update(await measure_allocations(base_url, make_request, args.alloc_samples, start=requests))
+    return results
+
+
+async def drive_todoapp(base_url, usernames, args):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        headers = [await login(client, name, PASSWORD) for name in usernames]
+    return await run_scenarios(base_url, todoapp_scenarios(args, headers, headers[0]), args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=500, help='requisições por rota')
+    parser.add_argument('--slow-requests', type=int, default=40, help='requisições por rota com bcrypt')
+    parser.add_argument('--alloc-samples', type=int, default=20, help='requisições sequenciais medidas com tracemalloc (0 desliga)')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--todos-per-user', type=int, default=200)
+    parser.add_argument('--books', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=10, help='itens por requisição nos endpoints /todos/bulk')
+    parser.add_argument('--routes', nargs='*', help='roda só as rotas cujo nome contém algum desses trechos')
+    parser.add_argument('--output', help='também grava o JSON neste arquivo')
+    args = parser.parse_args()
+
+    add_app_root()
+    results = {}
+    with temporary_workdir():
+        todoapp = importlib.import_module('TodoApp.main')
+        database = importlib.import_module('TodoApp.database')
+        usernames = seed_todoapp(database.engine, args.users, args.todos_per_user, PASSWORD)
+        with serve(todoapp.app) as base_url:
+            results.update(asyncio.run(drive_todoapp(base_url, usernames, args)))
+
+    books = importlib.import_module('books.books')
+    seed_books(books, args.books)
+    with serve(books.app) as base_url:
+        results.update(asyncio.run(run_scenarios(base_url, books_scenarios(args), args)))
+
+    books2 = importlib.import_module('books.books2')
+    first_id = seed_books2(books2, args.books)
+    with serve(books2.app) as base_url:
+        results.update(asyncio.run(run_scenarios(base_url, books2_scenarios(args, first_id), args)))
+
+    output = {
+        'benchmark': 'http_suite',
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'routes': results,
+    }
+    report(output)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(output, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
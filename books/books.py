@@ -2,45 +2,125 @@ from fastapi import Body, FastAPI  # Importa a classe FastAPI do framework
 
 app = FastAPI()  # Cria uma instância da aplicação FastAPI. Essa instância será usada para definir as rotas e configurações.
 
-BOOKS = [
+class BookStore:
+    """
+    Catálogo em memória com índices case-insensitive, para que as rotas não percorram (e nem façam casefold de) todos os livros.
+
+    Cada livro recebe uma chave interna sequencial (títulos podem se repetir, então o título não serve de chave).
+    O casefold de título, autor e categoria é feito uma vez só, quando o livro entra no catálogo, e alimenta os índices:
+
+    _by_title / _by_author / _by_category / _by_author_category → dict valor casefold → {chave: livro}
+
+    Os dicts internos mantêm a ordem de inserção, então os resultados saem na mesma ordem do catálogo.
+    """
+
+    def __init__(self, books=()):
+        self._books = {}
+        self._next_key = 0
+        self._by_title = {}
+        self._by_author = {}
+        self._by_category = {}
+        self._by_author_category = {}
+        self.extend(books)
+
+    def __len__(self):
+        return len(self._books)
+
+    def all(self):
+        return list(self._books.values())
+
+    def find_title(self, title):
+        return next(iter(self._by_title.get(fold(title), {}).values()), None)
+
+    def by_author(self, author):
+        return list(self._by_author.get(fold(author), {}).values())
+
+    def by_category(self, category):
+        return list(self._by_category.get(fold(category), {}).values())
+
+    def by_author_category(self, author, category):
+        return list(self._by_author_category.get((fold(author), fold(category)), {}).values())
+
+    def append(self, book):
+        key = self._next_key
+        self._next_key += 1
+        self._books[key] = book
+        self._index(key, book)
+
+    def extend(self, books):
+        for book in books:
+            self.append(book)
+
+    def replace_title(self, book):
+        # Troca (na mesma posição) todos os livros com o mesmo título do livro novo.
+        for key in list(self._by_title.get(fold(book.get('title')), {})):
+            self._unindex(key, self._books[key])
+            self._books[key] = book
+            self._index(key, book)
+
+    def remove_title(self, title):
+        # Remove só o primeiro livro com o título.
+        key = next(iter(self._by_title.get(fold(title), {})), None)
+        if key is not None:
+            self._unindex(key, self._books.pop(key))
+
+    def _index_keys(self, book):
+        author, category = fold(book.get('author')), fold(book.get('category'))
+        return (
+            (self._by_title, fold(book.get('title'))),
+            (self._by_author, author),
+            (self._by_category, category),
+            (self._by_author_category, (author, category)),
+        )
+
+    def _index(self, key, book):
+        for index, value in self._index_keys(book):
+            bucket = index.setdefault(value, {})
+            out_of_order = bool(bucket) and key < next(reversed(bucket))
+            bucket[key] = book
+            # Um livro atualizado pode entrar num índice que já tem livros posteriores a ele no catálogo:
+            # reordena só esse índice pela chave, para os resultados continuarem na ordem do catálogo.
+            if out_of_order:
+                index[value] = dict(sorted(bucket.items()))
+
+    def _unindex(self, key, book):
+        for index, value in self._index_keys(book):
+            bucket = index[value]
+            del bucket[key]
+            if not bucket:
+                del index[value]
+
+
+def fold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+BOOKS = BookStore([
     {'title': 'Title One', 'author': 'Author One', 'category': 'science'},
     {'title': 'Title Two', 'author': 'Author Two', 'category': 'science'},
     {'title': 'Title Three', 'author': 'Author Tree', 'category': 'history'},
     {'title': 'Title Four', 'author': 'Author Four', 'category': 'math'},
     {'title': 'Title Five', 'author': 'Author One', 'category': 'math'},
     {'title': 'Title Six', 'author': 'Author Six', 'category': 'math'},
-]
+])
 
 @app.get("/books")  # Esse é o decorator que "decora" a função abaixo.
 async def read_all_books():  
-    return BOOKS
+    return BOOKS.all()
 
 
 @app.get("/books/title/{book_title}") # {books_title} é o chamado parametro dinamico, o que você escreve na URL você consegue acessar dentro da função
 async def read_book(book_title: str):
-    for book in BOOKS:
-        if book.get('title').casefold() == book_title.casefold():
-            return book
+    return BOOKS.find_title(book_title)
 
 
 @app.get("/books/") # Na URL, após / deve ser adicionado um ? e então o parametro da função (query param)
 async def read_category_by_query(category: str):
-    books_to_return = []
-    for book in BOOKS:
-        if book.get('category').casefold() == category.casefold():
-            books_to_return.append(book)
-    
-    return books_to_return
+    return BOOKS.by_category(category)
 
 @app.get("/books/{book_author}/")
 async def read_author_category_by_query(book_author: str, category: str):
-    books_to_return = []
-    for book in BOOKS:
-        if book.get('author').casefold() == book_author.casefold() and \
-            book.get('category').casefold() == category.casefold():
-            books_to_return.append(book)
-    
-    return books_to_return
+    return BOOKS.by_author_category(book_author, category)
 
 @app.post("/books/create_book")
 async def create_book(new_book=Body()):
@@ -48,35 +128,22 @@ async def create_book(new_book=Body()):
 
 @app.put("/books/update_book")
 async def update_book(updated_book=Body()):
-    for i in range(len(BOOKS)):
-        if BOOKS[i].get('title').casefold() == updated_book.get('title').casefold():
-            BOOKS[i] = updated_book
+    BOOKS.replace_title(updated_book)
             
 
 @app.delete("/books/delete_book/{book_title}")
 async def delete_book(book_title: str):
-    for i in range(len(BOOKS)):
-        if BOOKS[i].get('title').casefold() == book_title.casefold():
-            BOOKS.pop(i)
-            break
+    BOOKS.remove_title(book_title)
         
 #EXERCÍCIO 1:
 @app.get("/books/all_books_one_author")
 async def all_books_one_author(author: str): 
-    books_to_return = []
-    for i in range(len(BOOKS)):
-        if BOOKS[i].get('author').casefold() == author.casefold():
-            books_to_return.append(BOOKS[i])
-    
-    return books_to_return
+    return BOOKS.by_author(author)
 
 #EXERCÍCIO 2:
 @app.get("/books/all_books_one_author_query/{author}")
 async def all_books_one_author_query(author: str):
-    books_to_return = []
-    for i in range(len(BOOKS)):
-        if BOOKS[i].get('author').casefold() == author.casefold():
-            books_to_return.append(BOOKS[i])
+    return BOOKS.by_author(author)
             
     
 
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Path, Query, HTTPException
 from pydantic import BaseModel, Field
 from starlette import status
+import threading
 from typing import Optional
 
 
@@ -46,27 +47,120 @@ class BookRequest(BaseModel): #Body
     }
     
         
-BOOKS = [
+class BookStore:
+    """
+    Catálogo em memória com índices, para que nenhuma rota precise percorrer a lista inteira de livros.
+
+    _books → dict id → livro (a ordem de inserção do dict é a ordem do catálogo)
+    _by_rating / _by_published_date → dict valor → {id: livro}, com os livros de cada rating/ano
+
+    Buscar por id é O(1) e filtrar por rating/ano é O(tamanho do resultado), não importa o tamanho do catálogo.
+    Remover também é O(1) (é só um 'del' nos dicts), então não há lista para deslocar nem buracos para compactar.
+    Os índices são atualizados em toda inclusão, troca e remoção, por isso os livros só devem ser alterados pelos métodos da classe.
+
+    Todas as operações passam pelo mesmo lock: com um servidor com várias threads (ou rotas 'def' rodando no threadpool)
+    duas requisições nunca alteram os dicts ao mesmo tempo, e uma leitura nunca percorre um dict que está sendo alterado.
+    """
+
+    def __init__(self, books=()):
+        self._lock = threading.Lock()
+        self._books = {}
+        self._by_rating = {}
+        self._by_published_date = {}
+        self._next_id = 1
+        self.extend(books)
+
+    def __len__(self):
+        return len(self._books)
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def all(self):
+        with self._lock:
+            return list(self._books.values())
+
+    def get(self, book_id):
+        # Um único dict.get já é atômico, não precisa do lock.
+        return self._books.get(book_id)
+
+    def by_rating(self, rating):
+        with self._lock:
+            return list(self._by_rating.get(rating, {}).values())
+
+    def by_published_date(self, published_date):
+        with self._lock:
+            return list(self._by_published_date.get(published_date, {}).values())
+
+    def allocate_id(self):
+        # Ids só crescem: um id nunca é reaproveitado, nem depois de apagar o último livro.
+        with self._lock:
+            book_id = self._next_id
+            self._next_id += 1
+            return book_id
+
+    def add(self, book):
+        with self._lock:
+            self._books[book.id] = book
+            self._next_id = max(self._next_id, book.id + 1)
+            self._index(book)
+
+    def extend(self, books):
+        for book in books:
+            self.add(book)
+
+    def replace(self, book):
+        # Devolve False se o id não existe. A troca mantém a posição do livro no catálogo.
+        with self._lock:
+            old = self._books.get(book.id)
+            if old is None:
+                return False
+            self._unindex(old)
+            self._books[book.id] = book
+            self._index(book)
+            return True
+
+    def remove(self, book_id):
+        with self._lock:
+            book = self._books.pop(book_id, None)
+            if book is None:
+                return False
+            self._unindex(book)
+            return True
+
+    def _index(self, book):
+        self._by_rating.setdefault(book.rating, {})[book.id] = book
+        self._by_published_date.setdefault(book.published_date, {})[book.id] = book
+
+    def _unindex(self, book):
+        for index, key in ((self._by_rating, book.rating), (self._by_published_date, book.published_date)):
+            bucket = index[key]
+            del bucket[book.id]
+            if not bucket:
+                del index[key]
+
+
+BOOKS = BookStore([
     Book(id = 1, title = 'Computer Science Pro', author = 'codingwithruby', description = 'A very nice book!', rating = 5, published_date=2018),
     Book(id = 2, title = 'Be fast with FastAPI', author = 'codingwithruby', description = 'A great book!', rating = 5, published_date=2018),
     Book(id = 3, title = 'Master Endpoints', author = 'codingwithruby', description = 'A awesome book!', rating = 5, published_date=2020),
     Book(id = 4, title = 'HP1', author = 'Author 1', description = 'Book description', rating = 2, published_date=2010),
     Book(id = 5, title = 'HP2', author = 'Author 2', description = 'Book description', rating = 3, published_date=2010),
     Book(id = 6, title = 'HP3', author = 'Author 3', description = 'Book description', rating = 1, published_date=2025)
-]
+])
     
     
 @app.get("/books", status_code=status.HTTP_200_OK)
 async def real_all_books():
-    return BOOKS
+    return BOOKS.all()
 
 
 
 @app.get("/books/{book_id}", status_code=status.HTTP_200_OK)
 async def read_book(book_id: int = Path(gt=(0))):
-    for book in BOOKS: 
-        if book.id == book_id:
-            return book
+    book = BOOKS.get(book_id)
+    if book is not None:
+        return book
         
     raise HTTPException(status_code=404, detail='Item not found')
         
@@ -75,32 +169,20 @@ async def read_book(book_id: int = Path(gt=(0))):
         
 @app.get('/books/', status_code=status.HTTP_200_OK)
 async def read_book_by_rating(book_rating: int = Query(gt=0, lt=6)): 
-    books_to_return = []
-    for book in BOOKS:
-        if book.rating == book_rating:
-            books_to_return.append(book)
-    return books_to_return
+    return BOOKS.by_rating(book_rating)
 
 @app.get('/books/published/', status_code=status.HTTP_200_OK)
 async def read_book_by_published_date(book_published_date: int = Query(gt=1999, lt=2025)): 
-    books_to_return = []
-    for book in BOOKS:
-        if book.published_date == book_published_date:
-            books_to_return.append(book)
-    
-    return books_to_return
+    return BOOKS.by_published_date(book_published_date)
             
 
 @app.post("/create-book", status_code=status.HTTP_201_CREATED)
 async def create_book(book_request: BookRequest):
     new_book = Book(**book_request.model_dump())
-    BOOKS.append(find_book_id(new_book))
+    BOOKS.add(find_book_id(new_book))
     
 def find_book_id(book: Book):
-    if len(BOOKS) > 0:
-        book.id = BOOKS[-1].id + 1
-    else:
-        book.id = 1
+    book.id = BOOKS.allocate_id()
     
     return book
 
@@ -108,22 +190,13 @@ def find_book_id(book: Book):
 
 @app.put('/books/update_book', status_code=status.HTTP_204_NO_CONTENT)
 async def update_book(book: BookRequest):
-    book_changed = False
-    for i in range(len(BOOKS)):
-        if BOOKS[i].id == book.id:
-            BOOKS[i] = book
-            book_changed = True
+    book_changed = BOOKS.replace(Book(**book.model_dump()))
     if not book_changed:
         raise HTTPException(status_code=404, detail='Item not found')  
             
             
 @app.delete("/books/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(book_id: int = Path(gt=0)):
-    book_changed = False
-    for i in range(len(BOOKS)):
-        if BOOKS[i].id == book_id:
-            BOOKS.pop(i)
-            book_changed = True
-            break
+    book_changed = BOOKS.remove(book_id)
     if not book_changed:
-        raise HTTPException(status_code=404, detail='Item not found')  
\ No newline at end of file
+        raise HTTPException(status_code=404, detail='Item not found')
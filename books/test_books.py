@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import books
+from books import BookStore, app
+
+
+def catalog():
+    return BookStore([
+        {'title': 'Title One', 'author': 'Author One', 'category': 'science'},
+        {'title': 'Repeated', 'author': 'Author Two', 'category': 'science'},
+        {'title': 'Title Three', 'author': 'Author One', 'category': 'math'},
+        {'title': 'repeated', 'author': 'Author Three', 'category': 'history'},
+    ])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Cada teste com um catálogo novo, sem alterar o BOOKS do módulo.
+    monkeypatch.setattr(books, 'BOOKS', catalog())
+    return TestClient(app)
+
+
+def test_find_title_returns_first_match_case_insensitive():
+    store = catalog()
+
+    assert store.find_title('REPEATED') == {'title': 'Repeated', 'author': 'Author Two', 'category': 'science'}
+    assert store.find_title('Missing') is None
+
+
+def test_lookups_keep_catalog_order():
+    store = catalog()
+    store.append({'title': 'Title Five', 'author': 'author one', 'category': 'Science'})
+
+    assert [book['title'] for book in store.by_author('AUTHOR ONE')] == ['Title One', 'Title Three', 'Title Five']
+    assert [book['title'] for book in store.by_category('science')] == ['Title One', 'Repeated', 'Title Five']
+    assert [book['title'] for book in store.by_author_category('Author One', 'SCIENCE')] == ['Title One', 'Title Five']
+
+
+def test_replace_title_updates_every_match_in_place():
+    store = catalog()
+    updated = {'title': 'REPEATED', 'author': 'Author Two', 'category': 'math'}
+
+    store.replace_title(updated)
+
+    assert [book['title'] for book in store.all()] == ['Title One', 'REPEATED', 'Title Three', 'REPEATED']
+    assert store.all()[1] == store.all()[3] == updated
+    assert len(store) == 4
+
+
+def test_replace_title_moves_book_between_author_category_buckets():
+    store = catalog()
+
+    store.replace_title({'title': 'Title One', 'author': 'Author Nine', 'category': 'history'})
+
+    assert store.by_author_category('Author One', 'science') == []
+    assert [book['title'] for book in store.by_author('Author One')] == ['Title Three']
+    assert [book['title'] for book in store.by_category('science')] == ['Repeated']
+    assert store.by_author_category('Author Nine', 'history') == [{'title': 'Title One', 'author': 'Author Nine', 'category': 'history'}]
+    assert [book['title'] for book in store.by_category('history')] == ['Title One', 'repeated']
+
+
+def test_remove_title_removes_only_first_match():
+    store = catalog()
+
+    store.remove_title('REPEATED')
+
+    assert [book['title'] for book in store.all()] == ['Title One', 'Title Three', 'repeated']
+    assert store.find_title('repeated') == {'title': 'repeated', 'author': 'Author Three', 'category': 'history'}
+    assert store.by_author('Author Two') == []
+
+    store.remove_title('Missing')
+    assert len(store) == 3
+
+
+def test_routes_follow_store_semantics(client):
+    assert client.get('/books/title/title one').json()['author'] == 'Author One'
+    assert [book['title'] for book in client.get('/books/', params={'category': 'SCIENCE'}).json()] == ['Title One', 'Repeated']
+
+    client.put('/books/update_book', json={'title': 'Title Three', 'author': 'Author Two', 'category': 'science'})
+    assert [book['title'] for book in client.get('/books/Author Two/', params={'category': 'science'}).json()] == ['Repeated', 'Title Three']
+    assert client.get('/books/Author One/', params={'category': 'math'}).json() == []
+
+    client.delete('/books/delete_book/repeated')
+    assert [book['title'] for book in client.get('/books').json()] == ['Title One', 'Title Three', 'repeated']
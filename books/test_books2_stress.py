@@ -0,0 +1,74 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from books2 import Book, BookStore, app
+
+THREADS = 16
+BOOKS_PER_THREAD = 2000
+
+
+def make_book(book_id, n):
+    return Book(id=book_id, title=f'Stress {n}', author='Stress', description='Stress test', rating=n % 5 + 1, published_date=2000 + n % 24)
+
+
+@pytest.fixture
+def fast_thread_switching():
+    # Troca de thread a cada poucos microssegundos para aumentar a chance de duas threads alterarem o catálogo ao mesmo tempo.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_parallel_create_and_delete_keeps_ids_and_indexes_consistent(fast_thread_switching):
+    store = BookStore([make_book(1, 0)])
+
+    def worker(thread):
+        kept = []
+        for n in range(BOOKS_PER_THREAD):
+            book = make_book(store.allocate_id(), n)
+            store.add(book)
+            store.by_rating(book.rating)  # leituras concorrentes com as escritas
+            if n % 2:
+                assert store.remove(book.id)
+            else:
+                kept.append(book.id)
+        return kept
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        kept = [book_id for ids in executor.map(worker, range(THREADS)) for book_id in ids]
+
+    assert len(kept) == len(set(kept))
+    assert sorted(book.id for book in store.all()) == sorted([1, *kept])
+    assert sum(len(store.by_rating(rating)) for rating in range(1, 6)) == len(store)
+    assert sum(len(store.by_published_date(year)) for year in range(2000, 2024)) == len(store)
+    assert store.allocate_id() == THREADS * BOOKS_PER_THREAD + 2
+
+
+def test_parallel_requests(fast_thread_switching):
+    client = TestClient(app)
+    body = {'title': 'Parallel book', 'author': 'Stress', 'description': 'Stress test', 'rating': 4, 'published_date': 2016}
+
+    def create(_):
+        return client.post('/create-book', json=body).status_code
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        assert set(executor.map(create, range(500))) == {201}
+
+    ids = [book['id'] for book in client.get('/books').json()]
+    assert len(ids) == len(set(ids))
+
+
+def test_deleted_last_id_is_not_reused():
+    client = TestClient(app)
+    body = {'title': 'Last book', 'author': 'Stress', 'description': 'Stress test', 'rating': 3, 'published_date': 2016}
+
+    client.post('/create-book', json=body)
+    last_id = client.get('/books').json()[-1]['id']
+    assert client.delete(f'/books/{last_id}').status_code == 204
+
+    client.post('/create-book', json=body)
+    assert client.get('/books').json()[-1]['id'] == last_id + 1